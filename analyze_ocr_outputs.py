@@ -3,16 +3,29 @@ from __future__ import annotations
 """Run Gemini analysis on OCR outputs using Vertex AI, mirroring 31.py logic."""
 
 import argparse
+import hashlib
 import json
 import logging
+import mmap
+import multiprocessing
+import os
+import sqlite3
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 
 from google.oauth2 import service_account
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - opsiyonel hizlandirici
+    orjson = None
+
 try:
     import vertexai
     from vertexai.generative_models import Content, GenerativeModel, GenerationConfig, Part
@@ -31,8 +44,39 @@ DEFAULT_MAX_OUTPUT_TOKENS = 2048
 DEFAULT_TEMPERATURE = 0.0
 DEFAULT_TOP_P = 0.9
 DEFAULT_TOP_K = 40
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_CHUNK_WORKERS = 4
+
+TERM_KEYS = ("terms", "terimler", "keywords", "anahtar_kelimeler")
+
+# Önbellek anahtarına katılır; prompt şablonu değişirse artırarak eski girdileri geçersiz kılın.
+PROMPT_VERSION = 1
+
+# Bu uzunluğun üzerindeki metinlerde tokenizasyon işlem havuzuna dağıtılır.
+PARALLEL_TOKENIZE_THRESHOLD = 4 * 1024 * 1024
+
+# Bu boyutun üzerindeki dosyalar belleğe kopyalanmak yerine mmap ile açılır.
+MMAP_THRESHOLD = 1024 * 1024
+
 
-TERM_KEYS = ["terms", "terimler", "keywords", "anahtar_kelimeler"]
+def _json_loads(text: str):
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+SYSTEM_INSTRUCTION = (
+    "Sen bir metin işleme yardımcısısın. Kullanıcının talimatını aynen uygula. "
+    "Mümkünse yanıtını JSON biçiminde döndür (ör: {\"terms\": [...]}) ve anahtar kelimeleri listele. "
+    "JSON üretemezsen düz metin dönebilirsin."
+)
+
+BATCH_POLL_SECONDS = 30
+BATCH_TERMINAL_STATES = {
+    "JOB_STATE_SUCCEEDED",
+    "JOB_STATE_FAILED",
+    "JOB_STATE_CANCELLED",
+    "JOB_STATE_EXPIRED",
+}
 
 
 @dataclass
@@ -49,6 +93,12 @@ class Args:
     temperature: float
     top_p: float
     top_k: int
+    max_workers: int
+    chunk_workers: int
+    batch: bool
+    batch_bucket: Optional[str]
+    no_cache: bool
+    tokenizer: Optional[str]
     verbose: bool
 
 
@@ -115,6 +165,37 @@ def parse_args(argv: Optional[List[str]] = None) -> Args:
         default=DEFAULT_TOP_K,
         help=f"Top-k (varsayılan: {DEFAULT_TOP_K}).",
     )
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=DEFAULT_MAX_WORKERS,
+        help=f"Aynı anda işlenecek dosya sayısı (varsayılan: {DEFAULT_MAX_WORKERS}).",
+    )
+    parser.add_argument(
+        "--chunk-workers",
+        type=int,
+        default=DEFAULT_CHUNK_WORKERS,
+        help=f"Bir dosyanın parçaları için eş zamanlı istek sayısı (varsayılan: {DEFAULT_CHUNK_WORKERS}).",
+    )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Parçaları tek tek göndermek yerine Vertex AI batch prediction işi kullanır.",
+    )
+    parser.add_argument(
+        "--batch-bucket",
+        help="Batch girdi/çıktı JSONL dosyaları için GCS bucket adı (--batch ile zorunlu).",
+    )
+    parser.add_argument(
+        "--tokenizer",
+        help="Parçalamayı karakter yerine token bazında yapar; tiktoken kodlama adı "
+        "(ör: cl100k_base). Bu kipte --chunk-size ve --chunk-overlap token sayısıdır.",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Kalıcı yanıt önbelleğini devre dışı bırakır (her parça yeniden sorgulanır).",
+    )
     parser.add_argument("--verbose", action="store_true", help="Detaylı log çıktısı.")
 
     raw = parser.parse_args(argv)
@@ -133,6 +214,12 @@ def parse_args(argv: Optional[List[str]] = None) -> Args:
         parser.error("--chunk-overlap negatif olamaz")
     if raw.chunk_overlap >= raw.chunk_size:
         parser.error("--chunk-overlap, --chunk-size değerinden küçük olmalı")
+    if raw.max_workers <= 0:
+        parser.error("--max-workers sıfırdan büyük olmalı")
+    if raw.chunk_workers <= 0:
+        parser.error("--chunk-workers sıfırdan büyük olmalı")
+    if raw.batch and not raw.batch_bucket:
+        parser.error("--batch için --batch-bucket belirtilmeli")
 
     return Args(
         output_root=output_root,
@@ -147,14 +234,46 @@ def parse_args(argv: Optional[List[str]] = None) -> Args:
         temperature=raw.temperature,
         top_p=raw.top_p,
         top_k=raw.top_k,
+        max_workers=raw.max_workers,
+        chunk_workers=raw.chunk_workers,
+        batch=raw.batch,
+        batch_bucket=raw.batch_bucket,
+        no_cache=raw.no_cache,
+        tokenizer=raw.tokenizer,
         verbose=raw.verbose,
     )
 
 
+_TEXT_SUFFIXES = tuple(SUPPORTED_TEXT_EXT)
+
+
+def _scan_dir(directory: str) -> Tuple[List[str], List[str]]:
+    subdirs: List[str] = []
+    files: List[str] = []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                elif entry.name.lower().endswith(_TEXT_SUFFIXES):
+                    files.append(entry.path)
+    except OSError as exc:
+        logging.warning("Klasör okunamadı (%s): %s", directory, exc)
+    return subdirs, files
+
+
 def find_text_files(root: Path) -> Iterable[Path]:
-    for path in root.rglob("*"):
-        if path.is_file() and path.suffix.lower() in SUPPORTED_TEXT_EXT:
-            yield path
+    """Dizinleri seviye seviye paralel listeleyerek .txt dosyalarını bulur."""
+    pending = [str(root)]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        while pending:
+            futures = [executor.submit(_scan_dir, directory) for directory in pending]
+            pending = []
+            for future in futures:
+                subdirs, files = future.result()
+                pending.extend(subdirs)
+                for file_path in files:
+                    yield Path(file_path)
 
 
 def read_text(path: Path) -> str:
@@ -164,46 +283,174 @@ def read_text(path: Path) -> str:
         return path.read_text(encoding="utf-8", errors="ignore")
 
 
-def chunk_text(text: str, chunk_size: int, overlap: int) -> List[str]:
-    if not text:
+def open_text_source(path: Path):
+    """Büyük dosyaları mmap olarak, küçükleri str olarak açar.
+
+    mmap kipinde parça pencereleri bayt bazlıdır ve ancak gönderilirken
+    çözümlenir; dosyanın tamamı için decode tamponu ayrılmaz.
+    """
+    try:
+        if path.stat().st_size > MMAP_THRESHOLD:
+            with path.open("rb") as handle:
+                return mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        pass
+    return read_text(path)
+
+
+def chunk_offsets(length: int, chunk_size: int, overlap: int) -> List[Tuple[int, int]]:
+    """Parça sınırlarını (başlangıç, bitiş) çiftleri olarak önceden hesaplar."""
+    if length <= 0:
         return []
-    chunks: List[str] = []
+    offsets: List[Tuple[int, int]] = []
     index = 0
-    length = len(text)
     while index < length:
         end = min(index + chunk_size, length)
-        chunks.append(text[index:end])
+        offsets.append((index, end))
         if end == length:
             break
         index = max(index + chunk_size - overlap, end)
-    return chunks
+    return offsets
+
+
+def chunk_text(text: str, chunk_size: int, overlap: int) -> List[str]:
+    return [text[start:end] for start, end in chunk_offsets(len(text), chunk_size, overlap)]
+
+
+def chunk_text_tokens(text: str, chunk_size: int, overlap: int, encoding_name: str) -> List[str]:
+    """Metni bir kez token'lara çevirip token sayısına göre parçalar."""
+    try:
+        import tiktoken
+    except ImportError as exc:
+        raise RuntimeError(
+            "Token bazlı parçalama için tiktoken paketi gerekli: pip install tiktoken"
+        ) from exc
+
+    encoder = tiktoken.get_encoding(encoding_name)
+    if len(text) > PARALLEL_TOKENIZE_THRESHOLD:
+        tokens = _encode_parallel(text, encoding_name)
+    else:
+        tokens = encoder.encode(text)
+    return [
+        encoder.decode(tokens[start:end])
+        for start, end in chunk_offsets(len(tokens), chunk_size, overlap)
+    ]
+
+
+def _split_segments(text: str, target: int) -> List[str]:
+    """Metni satır sonlarına hizalanmış ~target uzunluklu bölütlere ayırır."""
+    segments: List[str] = []
+    start = 0
+    length = len(text)
+    while start < length:
+        end = min(start + target, length)
+        if end < length:
+            newline = text.rfind("\n", start, end)
+            if newline > start:
+                end = newline + 1
+        segments.append(text[start:end])
+        start = end
+    return segments
+
+
+def _encode_segment(payload: Tuple[str, str]) -> List[int]:
+    import tiktoken
+
+    encoding_name, segment = payload
+    return tiktoken.get_encoding(encoding_name).encode(segment)
+
+
+def _encode_parallel(text: str, encoding_name: str) -> List[int]:
+    """Çok uzun metinlerde bölütleri işlem havuzunda ayrı ayrı token'lara çevirir.
+
+    Bölüt sınırları satır sonlarına hizalandığı için birleştirilen token dizisi,
+    satır içermeyen uç durumlar dışında tek geçişli kodlamayla aynıdır.
+    """
+    workers = os.cpu_count() or 1
+    target = max(len(text) // workers, 1 << 20)
+    segments = _split_segments(text, target)
+    if len(segments) <= 1:
+        return _encode_segment((encoding_name, text))
+    with multiprocessing.Pool(processes=min(workers, len(segments))) as pool:
+        token_lists = pool.map(_encode_segment, [(encoding_name, seg) for seg in segments])
+    return [token for tokens in token_lists for token in tokens]
+
+
+def chunk_accessor(source, args: Args) -> Tuple[int, Callable[[int], str]]:
+    """Parça sayısını ve indeksle tembel parça erişimini döndürür.
+
+    ``source`` bir ``str`` (karakter bazlı) veya ``mmap`` (bayt bazlı) olabilir.
+    """
+    if isinstance(source, str):
+        if args.tokenizer:
+            chunks = chunk_text_tokens(source, args.chunk_size, args.chunk_overlap, args.tokenizer)
+            return len(chunks), chunks.__getitem__
+        offsets = chunk_offsets(len(source), args.chunk_size, args.chunk_overlap)
+        return len(offsets), lambda index: source[offsets[index][0] : offsets[index][1]]
+
+    offsets = chunk_offsets(len(source), args.chunk_size, args.chunk_overlap)
+    return len(offsets), lambda index: source[offsets[index][0] : offsets[index][1]].decode(
+        "utf-8", "ignore"
+    )
+
+
+def _iter_balanced_objects(text: str) -> Iterable[str]:
+    """Metindeki dengeli {...} bloklarını tek ileri taramayla sırayla verir.
+
+    Parantez derinliğini izlerken string içeriğini ve kaçış karakterlerini
+    atlar; böylece yanıt içindeki süslü parantezler yanlış eşleşmez. Dengesiz
+    bir başlangıç paranteziyle karşılaşılırsa tarama bir sonraki parantezden
+    sürdürülür (deneme sayısı sınırlıdır).
+    """
+    index = text.find("{")
+    length = len(text)
+    attempts = 0
+    while index != -1 and attempts < 16:
+        attempts += 1
+        depth = 0
+        in_string = False
+        escaped = False
+        end = -1
+        for position in range(index, length):
+            char = text[position]
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif char == "\\":
+                    escaped = True
+                elif char == '"':
+                    in_string = False
+            elif char == '"':
+                in_string = True
+            elif char == "{":
+                depth += 1
+            elif char == "}":
+                depth -= 1
+                if depth == 0:
+                    end = position
+                    break
+        if end == -1:
+            index = text.find("{", index + 1)
+            continue
+        yield text[index : end + 1]
+        index = text.find("{", end + 1)
 
 
 def try_extract_json(text: str) -> Optional[Dict]:
     stripped = text.strip()
+    if "{" not in stripped:
+        return None
     try:
-        return json.loads(stripped)
+        return _json_loads(stripped)
     except Exception:
         pass
 
-    import re
-
-    code_blocks = re.findall(r"```json\s*(\{[\s\S]*?\})\s*```", stripped, re.MULTILINE)
-    for candidate in code_blocks:
+    for candidate in _iter_balanced_objects(stripped):
         try:
-            return json.loads(candidate)
+            return _json_loads(candidate)
         except Exception:
             continue
 
-    start = stripped.find("{")
-    end = stripped.rfind("}")
-    if start != -1 and end != -1 and end > start:
-        candidate = stripped[start : end + 1]
-        try:
-            return json.loads(candidate)
-        except Exception:
-            pass
-
     return None
 
 
@@ -214,70 +461,214 @@ def aggregate_results(per_chunk_results: List[Dict]) -> Dict:
         payload = item.get("parsed_json")
         if isinstance(payload, dict):
             for key in TERM_KEYS:
-                value = payload.get(key)
+                if key not in payload:
+                    continue
+                value = payload[key]
                 if isinstance(value, list):
-                    union.update({str(term).strip() for term in value if isinstance(term, str)})
+                    union.update(
+                        stripped
+                        for term in value
+                        if isinstance(term, str) and (stripped := term.strip())
+                    )
     if union:
-        agg["summary"]["unique_terms"] = sorted(term for term in union if term)
+        agg["summary"]["unique_terms"] = sorted(union)
     return agg
 
 
+class LLMCache:
+    """sha256(model|prompt|parça) anahtarlı kalıcı Gemini yanıt önbelleği (SQLite)."""
+
+    def __init__(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses (hash TEXT PRIMARY KEY, response TEXT, created_at INT)"
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(model: str, prompt: str, chunk: str) -> str:
+        material = f"{model}|{PROMPT_VERSION}|{prompt}|{chunk}"
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response FROM responses WHERE hash = ?", (key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def put(self, key: str, response: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (hash, response, created_at) VALUES (?, ?, ?)",
+                (key, response, int(time.time())),
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
 class GeminiRunner:
     def __init__(self, args: Args) -> None:
         self.args = args
         self.credentials = None
         self.project_id: Optional[str] = None
         self.model: Optional[GenerativeModel] = None
+        self._gen_config: Optional[GenerationConfig] = None
+        self._instruction_content: Optional[Content] = None
+        self.payload_static: Dict[str, Optional[str]] = {}
 
     def init(self) -> None:
         try:
-            self.credentials = service_account.Credentials.from_service_account_file(
-                str(self.args.service_account)
-            )
+            info = json.loads(self.args.service_account.read_text(encoding="utf-8"))
         except FileNotFoundError as exc:
             raise RuntimeError(f"Service account bulunamadı: {self.args.service_account}") from exc
+        except Exception as exc:  # noqa: BLE001 - service account parse failure
+            raise RuntimeError("Service account JSON okunamadı.") from exc
 
-        if self.project_id is None:
-            try:
-                data = json.loads(self.args.service_account.read_text(encoding="utf-8"))
-                self.project_id = data.get("project_id")
-            except Exception as exc:  # noqa: BLE001 - service account parse failure
-                raise RuntimeError("Service account JSON okunamadı.") from exc
+        self.credentials = service_account.Credentials.from_service_account_info(info)
+        self.project_id = info.get("project_id")
         if not self.project_id:
             raise RuntimeError("Service account dosyasında project_id alanı bulunamadı.")
 
         vertexai.init(project=self.project_id, location=self.args.region, credentials=self.credentials)
-        system_instruction = (
-            "Sen bir metin işleme yardımcısısın. Kullanıcının talimatını aynen uygula. "
-            "Mümkünse yanıtını JSON biçiminde döndür (ör: {\"terms\": [...]}) ve anahtar kelimeleri listele. "
-            "JSON üretemezsen düz metin dönebilirsin."
-        )
-        self.model = GenerativeModel(self.args.model, system_instruction=system_instruction)
-
-    def run_chunk(self, prompt: str, chunk_text: str) -> str:
-        if self.model is None:
-            raise RuntimeError("Gemini modeli başlatılmadı.")
-        generation_config = GenerationConfig(
+        self.payload_static = {
+            "model": self.args.model,
+            "region": self.args.region,
+            "project_id": self.project_id,
+            "prompt": self.args.prompt,
+        }
+        self.model = GenerativeModel(self.args.model, system_instruction=SYSTEM_INSTRUCTION)
+        self._gen_config = GenerationConfig(
             max_output_tokens=self.args.max_output_tokens,
             temperature=self.args.temperature,
             top_p=self.args.top_p,
             top_k=self.args.top_k,
         )
+        self._instruction_content = Content(
+            role="user",
+            parts=[
+                Part.from_text(
+                    "KULLANICI TALİMATI:\n" + self.args.prompt + "\n\n"
+                    "Lütfen mümkünse JSON biçiminde yanıtla (ör: {\"terms\": [...]})"
+                )
+            ],
+        )
+
+    def run_chunk(self, chunk_text: str) -> str:
+        if self.model is None:
+            raise RuntimeError("Gemini modeli başlatılmadı.")
         contents = [
-            Content(
-                role="user",
-                parts=[
-                    Part.from_text(
-                        "KULLANICI TALİMATI:\n" + prompt + "\n\n" +
-                        "Lütfen mümkünse JSON biçiminde yanıtla (ör: {\"terms\": [...]})"
-                    )
-                ],
-            ),
+            self._instruction_content,
             Content(role="user", parts=[Part.from_text("METİN PARÇASI:\n" + chunk_text)]),
         ]
-        response = self.model.generate_content(contents=contents, generation_config=generation_config)
+        response = self.model.generate_content(contents=contents, generation_config=self._gen_config)
         return (response.text or "").strip()
 
+    def _batch_request(self, prompt: str, chunk_text: str) -> Dict:
+        return {
+            "contents": [
+                {
+                    "role": "user",
+                    "parts": [
+                        {
+                            "text": "KULLANICI TALİMATI:\n" + prompt + "\n\n"
+                            "Lütfen mümkünse JSON biçiminde yanıtla (ör: {\"terms\": [...]})"
+                        }
+                    ],
+                },
+                {"role": "user", "parts": [{"text": "METİN PARÇASI:\n" + chunk_text}]},
+            ],
+            "system_instruction": {"parts": [{"text": SYSTEM_INSTRUCTION}]},
+            "generation_config": {
+                "max_output_tokens": self.args.max_output_tokens,
+                "temperature": self.args.temperature,
+                "top_p": self.args.top_p,
+                "top_k": self.args.top_k,
+            },
+        }
+
+    def run_batch(self, prompt: str, chunk_items: List[tuple[str, str]]) -> Dict[str, str]:
+        """Submit all chunks as one Vertex AI batch prediction job.
+
+        ``chunk_items`` eşleri ``(anahtar, parça metni)`` biçimindedir; dönen sözlük
+        aynı anahtarları model yanıtlarına eşler. Girdi/çıktı JSONL dosyaları
+        ``--batch-bucket`` altında saklanır.
+        """
+        try:
+            from google.cloud import aiplatform, storage
+        except ImportError as exc:
+            raise RuntimeError(
+                "Batch tahmin için google-cloud-aiplatform ve google-cloud-storage paketleri gerekli."
+            ) from exc
+
+        stamp = datetime.utcnow().strftime("%Y%m%d%H%M%S")
+        prefix = f"gemini_batch/{stamp}"
+        client = storage.Client(project=self.project_id, credentials=self.credentials)
+        bucket = client.bucket(self.args.batch_bucket)
+
+        # Birebir aynı parça metinleri aynı isteğe serileştirilir; her istek
+        # birden fazla anahtara karşılık gelebilir, yanıt başına bir tane düşülür.
+        keys_by_request: Dict[str, List[str]] = {}
+        lines: List[str] = []
+        for key, chunk in chunk_items:
+            request = self._batch_request(prompt, chunk)
+            serialized = json.dumps(request, ensure_ascii=False, sort_keys=True)
+            keys_by_request.setdefault(serialized, []).append(key)
+            lines.append(json.dumps({"request": request}, ensure_ascii=False))
+
+        input_uri = f"gs://{self.args.batch_bucket}/{prefix}/input.jsonl"
+        output_prefix = f"gs://{self.args.batch_bucket}/{prefix}/output"
+        bucket.blob(f"{prefix}/input.jsonl").upload_from_string(
+            "\n".join(lines), content_type="application/jsonl"
+        )
+        logging.info("Batch girdisi yüklendi: %s (%s parça)", input_uri, len(chunk_items))
+
+        aiplatform.init(project=self.project_id, location=self.args.region, credentials=self.credentials)
+        job = aiplatform.BatchPredictionJob.create(
+            model_name=f"publishers/google/models/{self.args.model}",
+            job_display_name=f"ocr-analysis-{stamp}",
+            gcs_source=input_uri,
+            gcs_destination_prefix=output_prefix,
+            instances_format="jsonl",
+            predictions_format="jsonl",
+            sync=False,
+        )
+
+        while True:
+            state = job.state.name if job.state else ""
+            if state in BATCH_TERMINAL_STATES:
+                break
+            logging.debug("Batch işi bekleniyor (durum=%s)...", state)
+            time.sleep(BATCH_POLL_SECONDS)
+        if state != "JOB_STATE_SUCCEEDED":
+            raise RuntimeError(f"Batch prediction işi başarısız oldu (durum={state}).")
+
+        responses: Dict[str, str] = {}
+        for blob in client.list_blobs(self.args.batch_bucket, prefix=f"{prefix}/output"):
+            if not blob.name.endswith(".jsonl"):
+                continue
+            for line in blob.download_as_text(encoding="utf-8").splitlines():
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                pending_keys = keys_by_request.get(
+                    json.dumps(record.get("request", {}), ensure_ascii=False, sort_keys=True)
+                )
+                if not pending_keys:
+                    continue
+                key = pending_keys.pop()
+                try:
+                    parts = record["response"]["candidates"][0]["content"]["parts"]
+                    responses[key] = "".join(part.get("text", "") for part in parts).strip()
+                except (KeyError, IndexError, TypeError):
+                    responses[key] = f"[MODEL HATA]: {record.get('status', 'yanıt çözümlenemedi')}"
+        return responses
+
 
 def mirror_output_paths(output_root: Path, analysis_dir: Path, file_path: Path) -> Dict[str, Path]:
     rel = file_path.relative_to(output_root)
@@ -291,28 +682,61 @@ def mirror_output_paths(output_root: Path, analysis_dir: Path, file_path: Path)
     }
 
 
-def process_file(runner: GeminiRunner, file_path: Path, args: Args, total: int, index: int) -> Optional[Dict]:
+def process_file(
+    runner: GeminiRunner,
+    file_path: Path,
+    args: Args,
+    total: int,
+    index: int,
+    cache: Optional[LLMCache] = None,
+) -> Optional[Dict]:
     logging.info("[%s/%s] İşleniyor: %s", index, total, file_path.relative_to(args.output_root))
-    text = read_text(file_path)
-    chunks = chunk_text(text, args.chunk_size, args.chunk_overlap)
-    logging.info("  ↳ Parça sayısı: %s", len(chunks))
-
-    per_chunk: List[Dict] = []
-    for chunk_index, chunk in enumerate(chunks, 1):
+    source = read_text(file_path) if args.tokenizer else open_text_source(file_path)
+    chunk_count, get_chunk = chunk_accessor(source, args)
+    logging.info("  ↳ Parça sayısı: %s", chunk_count)
+
+    def run_one(chunk_index: int) -> str:
+        chunk = get_chunk(chunk_index - 1)
+        if cache is not None:
+            key = LLMCache.key(args.model, args.prompt, chunk)
+            cached = cache.get(key)
+            if cached is not None:
+                logging.debug("    - Chunk %s önbellekten okundu", chunk_index)
+                return cached
         try:
-            response_text = runner.run_chunk(args.prompt, chunk)
+            response = runner.run_chunk(chunk)
         except Exception as exc:  # noqa: BLE001
-            response_text = f"[MODEL HATA]: {exc}"
             logging.error("    - Chunk %s başarısız: %s", chunk_index, exc)
-        parsed = try_extract_json(response_text)
-        per_chunk.append(
-            {
-                "chunk_index": chunk_index,
-                "raw_response": response_text,
-                "parsed_json": parsed,
-            }
-        )
+            return f"[MODEL HATA]: {exc}"
+        if cache is not None:
+            cache.put(key, response)
+        return response
 
+    responses: List[Optional[str]] = [None] * chunk_count
+    try:
+        with ThreadPoolExecutor(max_workers=args.chunk_workers) as executor:
+            futures = {executor.submit(run_one, index + 1): index for index in range(chunk_count)}
+            for future in as_completed(futures):
+                responses[futures[future]] = future.result()
+    finally:
+        if isinstance(source, mmap.mmap):
+            source.close()
+
+    per_chunk: List[Dict] = [
+        {
+            "chunk_index": index,
+            "raw_response": response_text,
+            "parsed_json": try_extract_json(response_text),
+        }
+        for index, response_text in enumerate(responses, 1)
+    ]
+
+    return write_file_outputs(runner, file_path, args, per_chunk)
+
+
+def write_file_outputs(
+    runner: GeminiRunner, file_path: Path, args: Args, per_chunk: List[Dict]
+) -> Optional[Dict]:
     if not per_chunk:
         logging.warning("Boş çıktı nedeniyle atlandı: %s", file_path)
         return None
@@ -325,15 +749,16 @@ def process_file(runner: GeminiRunner, file_path: Path, args: Args, total: int,
     payload = {
         "input_file": str(file_path),
         "relative_path": str(file_path.relative_to(args.output_root)),
-        "model": args.model,
-        "region": args.region,
-        "project_id": runner.project_id,
-        "prompt": args.prompt,
-        "created_at": datetime.utcnow().isoformat() + "Z",
+        **runner.payload_static,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
         "results": aggregated,
     }
 
-    paths["json"].write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    if orjson is not None:
+        paths["json"].write_bytes(orjson.dumps(payload, option=orjson.OPT_INDENT_2))
+    else:
+        with paths["json"].open("w", encoding="utf-8") as handle:
+            json.dump(payload, handle, ensure_ascii=False, indent=2)
 
     with paths["txt"].open("w", encoding="utf-8") as handle:
         handle.write(f"# Kaynak: {payload['relative_path']}\n")
@@ -362,6 +787,51 @@ def process_file(runner: GeminiRunner, file_path: Path, args: Args, total: int,
     return payload
 
 
+def run_batch_analysis(runner: GeminiRunner, text_files: List[Path], args: Args) -> tuple[List[Dict], int]:
+    """Tüm dosyaların parçalarını tek bir batch prediction işiyle analiz eder."""
+    chunk_items: List[tuple[str, str]] = []
+    file_keys: List[tuple[Path, List[str]]] = []
+    for file_path in text_files:
+        text = read_text(file_path)
+        if args.tokenizer:
+            chunks = chunk_text_tokens(text, args.chunk_size, args.chunk_overlap, args.tokenizer)
+        else:
+            chunks = chunk_text(text, args.chunk_size, args.chunk_overlap)
+        rel = file_path.relative_to(args.output_root)
+        keys = [f"{rel}::{index}" for index in range(1, len(chunks) + 1)]
+        chunk_items.extend(zip(keys, chunks))
+        file_keys.append((file_path, keys))
+
+    if not chunk_items:
+        logging.warning("Batch için gönderilecek parça bulunamadı.")
+        return [], 0
+
+    responses = runner.run_batch(args.prompt, chunk_items)
+
+    processed: List[Dict] = []
+    errors = 0
+    for file_path, keys in file_keys:
+        per_chunk: List[Dict] = []
+        for index, key in enumerate(keys, 1):
+            response_text = responses.get(key, "[MODEL HATA]: batch yanıtı alınamadı")
+            per_chunk.append(
+                {
+                    "chunk_index": index,
+                    "raw_response": response_text,
+                    "parsed_json": try_extract_json(response_text),
+                }
+            )
+        try:
+            payload = write_file_outputs(runner, file_path, args, per_chunk)
+        except Exception as exc:  # noqa: BLE001
+            errors += 1
+            logging.error("Dosya işlenemedi (%s): %s", file_path, exc)
+            continue
+        if payload is not None:
+            processed.append(payload)
+    return processed, errors
+
+
 def write_combined_report(
     combined_path: Path,
     args: Args,
@@ -391,7 +861,12 @@ def write_combined_report(
             handle.write(f"## {payload['relative_path']}\n")
             terms = payload.get("results", {}).get("summary", {}).get("unique_terms")
             if terms:
-                handle.write("- Terimler: " + ", ".join(terms) + "\n")
+                handle.write("- Terimler: ")
+                for term_index, term in enumerate(terms):
+                    if term_index:
+                        handle.write(", ")
+                    handle.write(term)
+                handle.write("\n")
             else:
                 handle.write("- Terim bulunamadı\n")
             handle.write("\n")
@@ -429,16 +904,38 @@ def main(argv: Optional[List[str]] = None) -> int:
     processed: List[Dict] = []
     errors = 0
 
-    for index, file_path in enumerate(text_files, 1):
+    if args.batch:
         try:
-            payload = process_file(runner, file_path, args, total=len(text_files), index=index)
+            processed, errors = run_batch_analysis(runner, text_files, args)
         except Exception as exc:  # noqa: BLE001
-            errors += 1
-            logging.error("Dosya işlenemedi (%s): %s", file_path, exc)
-            continue
-        if payload is None:
-            continue
-        processed.append(payload)
+            logging.error("Batch analizi başarısız: %s", exc)
+            return 1
+    else:
+        cache: Optional[LLMCache] = None
+        if not args.no_cache:
+            cache = LLMCache(args.output_root / args.analysis_dir_name / "llm_cache.sqlite3")
+        try:
+            with ThreadPoolExecutor(max_workers=args.max_workers) as executor:
+                futures = {
+                    executor.submit(
+                        process_file, runner, file_path, args, len(text_files), index, cache
+                    ): file_path
+                    for index, file_path in enumerate(text_files, 1)
+                }
+                for future in as_completed(futures):
+                    file_path = futures[future]
+                    try:
+                        payload = future.result()
+                    except Exception as exc:  # noqa: BLE001
+                        errors += 1
+                        logging.error("Dosya işlenemedi (%s): %s", file_path, exc)
+                        continue
+                    if payload is None:
+                        continue
+                    processed.append(payload)
+        finally:
+            if cache is not None:
+                cache.close()
 
     if not processed:
         logging.warning("Hiçbir dosya başarıyla işlenemedi.")
@@ -2,14 +2,20 @@
 from __future__ import annotations
 
 import argparse
-import io
 import logging
 import re
 import sys
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
 from pathlib import Path
 from typing import Dict, Iterable, Tuple
 
+_SANITIZE_RE = re.compile(r'[<>:"/\\|?*\r\n]+')
+
 GOOGLE_FOLDER_MIME = "application/vnd.google-apps.folder"
+DEFAULT_WORKERS = 8
+LIST_WORKERS = 8
+DEFAULT_CHUNK_BYTES = 4 * 1024 * 1024
 GOOGLE_EXPORTS: Dict[str, Tuple[str, str]] = {
     "application/vnd.google-apps.document": ("application/pdf", ".pdf"),
     "application/vnd.google-apps.presentation": ("application/pdf", ".pdf"),
@@ -34,6 +40,18 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Var olan dosyalari yeniden indirir",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Es zamanli indirme is parcacigi sayisi (varsayilan: {DEFAULT_WORKERS})",
+    )
+    parser.add_argument(
+        "--chunk-bytes",
+        type=int,
+        default=DEFAULT_CHUNK_BYTES,
+        help=f"Indirme parca boyutu (bayt, varsayilan: {DEFAULT_CHUNK_BYTES})",
+    )
     parser.add_argument(
         "--verbose",
         action="store_true",
@@ -43,79 +61,149 @@ def parse_args() -> argparse.Namespace:
 
 
 def sanitize_filename(name: str) -> str:
-    sanitized = re.sub(r'[<>:"/\\|?*\r\n]+', "_", name)
-    sanitized = sanitized.strip()
+    sanitized = _SANITIZE_RE.sub("_", name).strip()
     return sanitized or "unnamed"
 
 
-def build_drive_service(service_account_path: Path):
+def build_credentials(service_account_path: Path):
     try:
         from google.oauth2 import service_account
-        from googleapiclient.discovery import build
     except ImportError as exc:
         raise RuntimeError(
             "Google Drive indirimi icin google-api-python-client ve google-auth paketleri gerekli: pip install google-api-python-client google-auth-httplib2 google-auth-oauthlib"
         ) from exc
 
     scopes = ["https://www.googleapis.com/auth/drive.readonly"]
-    creds = service_account.Credentials.from_service_account_file(str(service_account_path), scopes=scopes)
-    return build("drive", "v3", credentials=creds, cache_discovery=False)
+    return service_account.Credentials.from_service_account_file(str(service_account_path), scopes=scopes)
 
 
-def _download_request(request, target_path: Path, downloader_cls) -> None:
-    from googleapiclient.http import MediaIoBaseDownload
+def build_drive_service(credentials):
+    try:
+        from googleapiclient.discovery import build
+    except ImportError as exc:
+        raise RuntimeError(
+            "Google Drive indirimi icin google-api-python-client ve google-auth paketleri gerekli: pip install google-api-python-client google-auth-httplib2 google-auth-oauthlib"
+        ) from exc
+
+    return build("drive", "v3", credentials=credentials, cache_discovery=False)
+
+
+_thread_local = threading.local()
+
 
+def _worker_service(credentials):
+    """Her indirme is parcacigi icin ayri Drive servisi (istemciler thread-safe degil)."""
+    service = getattr(_thread_local, "service", None)
+    if service is None:
+        service = build_drive_service(credentials)
+        _thread_local.service = service
+    return service
+
+
+def _download_request(request, target_path: Path, downloader_cls, chunk_bytes: int = DEFAULT_CHUNK_BYTES) -> None:
     target_path.parent.mkdir(parents=True, exist_ok=True)
-    buffer = io.BytesIO()
-    downloader = downloader_cls(buffer, request)
-    done = False
-    while not done:
-        _, done = downloader.next_chunk()
-    target_path.write_bytes(buffer.getvalue())
+    tmp_path = target_path.with_suffix(target_path.suffix + ".part")
+    try:
+        with tmp_path.open("wb") as handle:
+            downloader = downloader_cls(handle, request, chunksize=chunk_bytes)
+            done = False
+            while not done:
+                _, done = downloader.next_chunk()
+        tmp_path.replace(target_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
 
 
-def download_drive_folder(service_account_path: Path, folder_id: str, destination: Path, overwrite: bool) -> None:
+def _download_item(credentials, file_id: str, export_mime, name: str, target_path: Path, chunk_bytes: int) -> None:
     from googleapiclient.errors import HttpError
     from googleapiclient.http import MediaIoBaseDownload
 
-    service = build_drive_service(service_account_path)
+    service = _worker_service(credentials)
+    try:
+        if export_mime:
+            logging.info("Drive dosyasi export ediliyor: %s -> %s", name, target_path)
+            request = service.files().export_media(fileId=file_id, mimeType=export_mime)
+        else:
+            logging.info("Drive dosyasi indiriliyor: %s -> %s", name, target_path)
+            request = service.files().get_media(fileId=file_id)
+        _download_request(request, target_path, MediaIoBaseDownload, chunk_bytes)
+    except HttpError as exc:
+        logging.error("Dosya indirilemedi (%s): %s", target_path, exc)
+
+
+def _list_folder(credentials, folder_id: str) -> Tuple[list, list]:
+    """Bir klasorun tum sayfalarini listeler; (dosyalar, alt klasorler) dondurur."""
+    service = _worker_service(credentials)
+    files: list = []
+    folders: list = []
+    page_token = None
+    while True:
+        response = service.files().list(
+            q=f"'{folder_id}' in parents and trashed = false",
+            fields="nextPageToken, files(id, name, mimeType)",
+            pageToken=page_token,
+            pageSize=1000,
+        ).execute()
+        for item in response.get("files", []):
+            if item.get("mimeType", "") == GOOGLE_FOLDER_MIME:
+                folders.append(item)
+            else:
+                files.append(item)
+        page_token = response.get("nextPageToken")
+        if not page_token:
+            break
+    return files, folders
+
+
+def download_drive_folder(
+    service_account_path: Path,
+    folder_id: str,
+    destination: Path,
+    overwrite: bool,
+    workers: int = DEFAULT_WORKERS,
+    chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+) -> None:
+    credentials = build_credentials(service_account_path)
     destination.mkdir(parents=True, exist_ok=True)
     logging.info("Drive klasoru indiriliyor: %s -> %s", folder_id, destination)
 
-    queue: list[tuple[str, Path]] = [(folder_id, destination)]
-    visited: set[str] = set()
-
-    while queue:
-        current_id, current_dest = queue.pop()
-        if current_id in visited:
-            continue
-        visited.add(current_id)
-        current_dest.mkdir(parents=True, exist_ok=True)
-
-        page_token = None
-        while True:
-            response = service.files().list(
-                q=f"'{current_id}' in parents and trashed = false",
-                fields="nextPageToken, files(id, name, mimeType)",
-                pageToken=page_token,
-                pageSize=1000,
-            ).execute()
-
-            for item in response.get("files", []):
-                file_id = item["id"]
-                name = sanitize_filename(item.get("name", "isimsiz"))
-                mime_type = item.get("mimeType", "")
-                target_path = current_dest / name
-
-                if mime_type == GOOGLE_FOLDER_MIME:
-                    queue.append((file_id, target_path))
-                    continue
+    visited: set[str] = {folder_id}
+    visited_lock = threading.Lock()
+    futures = []
 
-                if not overwrite and target_path.exists():
-                    logging.info("Zaten var, atlaniyor: %s", target_path)
-                    continue
+    with ThreadPoolExecutor(max_workers=workers) as download_pool, ThreadPoolExecutor(
+        max_workers=LIST_WORKERS
+    ) as list_pool:
+        inflight = {list_pool.submit(_list_folder, credentials, folder_id): destination}
 
+        while inflight:
+            completed, _ = wait(set(inflight), return_when=FIRST_COMPLETED)
+            for future in completed:
+                current_dest = inflight.pop(future)
                 try:
+                    files, folders = future.result()
+                except Exception as exc:  # noqa: BLE001
+                    logging.error("Klasor listelenemedi (%s): %s", current_dest, exc)
+                    continue
+                current_dest.mkdir(parents=True, exist_ok=True)
+
+                for item in folders:
+                    sub_id = item["id"]
+                    with visited_lock:
+                        if sub_id in visited:
+                            continue
+                        visited.add(sub_id)
+                    sub_dest = current_dest / sanitize_filename(item.get("name", "isimsiz"))
+                    inflight[list_pool.submit(_list_folder, credentials, sub_id)] = sub_dest
+
+                for item in files:
+                    file_id = item["id"]
+                    name = sanitize_filename(item.get("name", "isimsiz"))
+                    mime_type = item.get("mimeType", "")
+                    target_path = current_dest / name
+
+                    export_mime = None
                     if mime_type.startswith("application/vnd.google-apps"):
                         export = GOOGLE_EXPORTS.get(mime_type)
                         if not export:
@@ -124,19 +212,19 @@ def download_drive_folder(service_account_path: Path, folder_id: str, destinatio
                         export_mime, suffix = export
                         if target_path.suffix.lower() != suffix:
                             target_path = target_path.with_suffix(suffix)
-                        logging.info("Drive dosyasi export ediliyor: %s -> %s", name, target_path)
-                        request = service.files().export_media(fileId=file_id, mimeType=export_mime)
-                        _download_request(request, target_path, MediaIoBaseDownload)
-                    else:
-                        logging.info("Drive dosyasi indiriliyor: %s -> %s", name, target_path)
-                        request = service.files().get_media(fileId=file_id)
-                        _download_request(request, target_path, MediaIoBaseDownload)
-                except HttpError as exc:
-                    logging.error("Dosya indirilemedi (%s): %s", target_path, exc)
 
-            page_token = response.get("nextPageToken")
-            if not page_token:
-                break
+                    if not overwrite and target_path.exists():
+                        logging.info("Zaten var, atlaniyor: %s", target_path)
+                        continue
+
+                    futures.append(
+                        download_pool.submit(
+                            _download_item, credentials, file_id, export_mime, name, target_path, chunk_bytes
+                        )
+                    )
+
+        for future in as_completed(futures):
+            future.result()
 
 
 def main() -> int:
@@ -154,7 +242,14 @@ def main() -> int:
         return 1
 
     try:
-        download_drive_folder(service_account_path, args.folder_id, destination, args.overwrite)
+        download_drive_folder(
+            service_account_path,
+            args.folder_id,
+            destination,
+            args.overwrite,
+            workers=args.workers,
+            chunk_bytes=args.chunk_bytes,
+        )
     except Exception as exc:  # noqa: BLE001
         logging.error("Drive klasoru indirilemedi: %s", exc)
         return 1
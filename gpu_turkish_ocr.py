@@ -2,11 +2,21 @@
 from __future__ import annotations
 
 import argparse
+import atexit
+import contextlib
+import functools
 import logging
+import multiprocessing
+import os
 import sys
 import tempfile
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
-from typing import Dict, Iterable
+from typing import Callable, Dict, Iterable, Optional
+
+# torch import edilmeden once ayarlanmali; uzun kosularda CUDA bellek
+# parcalanmasindan kaynakli OOM'lari onler.
+os.environ.setdefault("PYTORCH_CUDA_ALLOC_CONF", "expandable_segments:True")
 
 try:
     import easyocr
@@ -26,6 +36,13 @@ SUPPORTED_IMAGE_EXT = {
 SUPPORTED_PDF_EXT = {".pdf"}
 SUPPORTED_PPTX_EXT = {".pptx"}
 SUPPORTED_EXTENSIONS = SUPPORTED_IMAGE_EXT | SUPPORTED_PDF_EXT | SUPPORTED_PPTX_EXT
+SUPPORTED_EXTENSIONS_NODOT = frozenset(ext.lstrip(".") for ext in SUPPORTED_EXTENSIONS)
+
+DEFAULT_OCR_BATCH_SIZE = 4
+DEFAULT_OCR_DPI = 150
+
+# Sayfa basina bu kadar karakter varsa PDF'in metin katmani guvenilir sayilir.
+NATIVE_TEXT_MIN_CHARS_PER_PAGE = 200
 
 
 def parse_args() -> argparse.Namespace:
@@ -50,6 +67,41 @@ def parse_args() -> argparse.Namespace:
         default="auto",
         help="Kullanilacak islemci: auto -> GPU varsa kullanir, yoksa CPU; cuda -> GPU zorunlu; cpu -> sadece CPU.",
     )
+    parser.add_argument(
+        "--ocr-dpi",
+        type=int,
+        default=DEFAULT_OCR_DPI,
+        help=f"OCR'a verilecek etkin DPI; --dpi'dan dusukse sayfalar kucultulur (varsayilan: {DEFAULT_OCR_DPI}).",
+    )
+    parser.add_argument(
+        "--ocr-batch-size",
+        type=int,
+        default=DEFAULT_OCR_BATCH_SIZE,
+        help=f"Tek OCR cagrisinda islenecek sayfa sayisi; VRAM'e gore ayarlanir (varsayilan: {DEFAULT_OCR_BATCH_SIZE}).",
+    )
+    parser.add_argument(
+        "--empty-cache-every",
+        type=int,
+        default=20,
+        help="Bu kadar dosyada bir torch.cuda.empty_cache() cagrilir; 0 kapatir (varsayilan: 20).",
+    )
+    parser.add_argument(
+        "--precision",
+        choices=("fp32", "fp16"),
+        default="fp16",
+        help="Cikarim hassasiyeti; fp16 yalnizca uygun CUDA GPU'larda etkinlesir (varsayilan: fp16).",
+    )
+    parser.add_argument(
+        "--force-ocr",
+        action="store_true",
+        help="PDF'lerin gomulu metin katmanini yok sayar, her sayfayi OCR ile tarar.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="OCR icin ayri surec sayisi; her surec kendi Reader kopyasini tutar (0 -> VRAM'e gore otomatik, varsayilan: 1).",
+    )
     parser.add_argument(
         "--force",
         action="store_true",
@@ -86,64 +138,619 @@ def select_device(choice: str) -> bool:
     return False
 
 
-def build_reader(use_gpu: bool) -> easyocr.Reader:
+def _fp16_supported() -> bool:
+    """FP16 ancak compute capability >= 7.0 (Tensor Core) GPU'larda hizlidir."""
+    try:
+        import torch
+
+        if not torch.cuda.is_available():
+            return False
+        major, _ = torch.cuda.get_device_capability()
+        return major >= 7
+    except Exception:  # noqa: BLE001 - olculemezse fp32'de kalinir
+        return False
+
+
+def _half_module(module):
+    """Modulu FP16'ya cevirir; forward girdilerini half'e, ciktilarini float32'ye
+    geri donusturur. EasyOCR girdileri float32 hazirlar ve detektor ciktisini
+    dogrudan cv2'ye verir; cv2 float16 formatini desteklemedigi icin ciktilar
+    (CRAFT'in (y, feature) demeti dahil) float'a cevrilmeden birakilamaz."""
+    import torch
+
+    module = module.half()
+    original_forward = module.forward
+
+    def _to_half(value):
+        if torch.is_tensor(value) and value.is_floating_point():
+            return value.half()
+        return value
+
+    def _to_float(value):
+        if torch.is_tensor(value) and value.is_floating_point():
+            return value.float()
+        if isinstance(value, tuple):
+            return tuple(_to_float(item) for item in value)
+        return value
+
+    def forward(*inputs, **kwargs):
+        inputs = tuple(_to_half(tensor) for tensor in inputs)
+        return _to_float(original_forward(*inputs, **kwargs))
+
+    module.forward = forward
+    return module
+
+
+def build_reader(use_gpu: bool, precision: str = "fp16") -> easyocr.Reader:
     logging.info("EasyOCR yukleniyor (GPU=%s)...", use_gpu)
-    return easyocr.Reader(["tr"], gpu=use_gpu)
+    reader = easyocr.Reader(["tr"], gpu=use_gpu)
+    if use_gpu and precision == "fp16":
+        if _fp16_supported():
+            reader.detector = _half_module(reader.detector)
+            reader.recognizer = _half_module(reader.recognizer)
+            logging.info("FP16 cikarim etkinlestirildi.")
+        else:
+            logging.info("GPU FP16 icin uygun degil, fp32 kullanilacak.")
+    return reader
+
+
+@functools.lru_cache(maxsize=2)
+def get_reader(use_gpu: bool, precision: str = "fp16") -> easyocr.Reader:
+    """Surec genelinde paylasilan Reader: ayni (GPU, hassasiyet) cifti icin
+    model yalnizca bir kez yuklenir; GUI gibi uzun omurlu cagiranlar soguk
+    baslangic bedelini tek sefer oder."""
+    return build_reader(use_gpu, precision)
+
+
+def preprocess_page_array(page_array, render_dpi: int = 0, ocr_dpi: int = 0):
+    """Sayfa dizisini gri tona cevirir; OCR DPI render DPI'dan dusukse
+    INTER_AREA ile kucultur. EasyOCR tek kanal uint8 girdiyi kabul eder ve
+    kanal/cozunurluk dusumu GPU bant genisligini belirgin azaltir."""
+    try:
+        import cv2
+    except ImportError as exc:
+        raise RuntimeError("opencv kutuphanesi eksik: pip install opencv-python-headless") from exc
+
+    if page_array.ndim == 3:
+        page_array = cv2.cvtColor(page_array, cv2.COLOR_RGB2GRAY)
+    if 0 < ocr_dpi < render_dpi:
+        scale = ocr_dpi / render_dpi
+        page_array = cv2.resize(page_array, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    return page_array
 
 
 def extract_from_image(reader: easyocr.Reader, image_path: Path) -> str:
     logging.debug("Gorsel OCR: %s", image_path)
-    results = reader.readtext(str(image_path), detail=0, paragraph=True)
-    lines = [line.strip() for line in results if line and line.strip()]
-    return "\n".join(lines)
+    try:
+        import numpy as np
+        from PIL import Image
+    except ImportError as exc:
+        raise RuntimeError("numpy ve pillow kutuphaneleri eksik: pip install numpy pillow") from exc
+
+    with Image.open(image_path) as image:
+        image_array = np.asarray(image.convert("RGB"))
+    return ocr_image_array(reader, preprocess_page_array(image_array))
+
+
+def ocr_image_array(reader: easyocr.Reader, image_array) -> str:
+    with _infer():
+        results = reader.readtext(image_array, detail=0, paragraph=True)
+    return "\n".join(s for line in results if line and (s := line.strip()))
+
+
+@contextlib.contextmanager
+def _infer():
+    """torch yuklenmisse inference_mode altinda calisir; autograd defteri
+    kapatmak hem kucuk bir hiz hem de VRAM kazandirir."""
+    torch_module = sys.modules.get("torch")
+    if torch_module is None:
+        yield
+        return
+    with torch_module.inference_mode():
+        yield
+
+
+def _maybe_empty_cache(files_done: int, every: int) -> None:
+    if every <= 0 or files_done % every:
+        return
+    torch_module = sys.modules.get("torch")
+    if torch_module is not None and torch_module.cuda.is_available():
+        torch_module.cuda.empty_cache()
+
+
+def _readtext_batched_once(reader: easyocr.Reader, page_arrays: list, batch_size: int):
+    """Ayni boyuttaki sayfalari okur; GPU bellegi yetmezse batch'i yariya
+    indirip yeniden dener, en kotu durumda sayfa sayfa okur."""
+    while True:
+        try:
+            with _infer():
+                return reader.readtext_batched(
+                    page_arrays, detail=0, paragraph=True, batch_size=batch_size
+                )
+        except RuntimeError as exc:
+            if batch_size <= 1 or "out of memory" not in str(exc).lower():
+                raise
+            batch_size = max(1, batch_size // 2)
+            logging.warning("GPU bellegi yetmedi, OCR batch boyutu %s'e dusuruldu.", batch_size)
+            torch_module = sys.modules.get("torch")
+            if torch_module is not None and torch_module.cuda.is_available():
+                torch_module.cuda.empty_cache()
+
+
+def _readtext_batched_oom_safe(reader: easyocr.Reader, page_arrays: list, batch_size: int):
+    """readtext_batched'i sekil gruplari halinde calistirir.
+
+    EasyOCR batched yol sayfalari np.array ile istifler; dikey/yatay karisik
+    PDF'lerde sekiller farkli oldugu icin bu ValueError verir. Sayfalar once
+    sekillerine gore gruplanir, sonuclar girdi sirasina gore birlestirilir.
+    """
+    groups: dict = {}
+    for index, page in enumerate(page_arrays):
+        groups.setdefault(page.shape, []).append(index)
+    if len(groups) <= 1:
+        return _readtext_batched_once(reader, page_arrays, batch_size)
+
+    results = [None] * len(page_arrays)
+    for indexes in groups.values():
+        group_results = _readtext_batched_once(
+            reader, [page_arrays[i] for i in indexes], batch_size
+        )
+        for index, page_results in zip(indexes, group_results):
+            results[index] = page_results
+    return results
+
+
+def _page_chunks(results_per_page, first_page: int) -> list:
+    chunks: list[str] = []
+    for index, results in enumerate(results_per_page, start=first_page):
+        page_text = "\n".join(s for line in results if line and (s := line.strip()))
+        if page_text:
+            chunks.append(f"--- Sayfa {index} ---")
+            chunks.append(page_text)
+    return chunks
+
+
+def ocr_page_arrays(reader: easyocr.Reader, page_arrays: list, batch_size: int) -> str:
+    """Sayfa dizilerini tek batched OCR cagrisiyla okur ve sayfa basliklariyla birlestirir."""
+    if not page_arrays:
+        return ""
+    results_per_page = _readtext_batched_oom_safe(reader, page_arrays, batch_size)
+    return "\n\n".join(_page_chunks(results_per_page, 1))
+
+
+def native_text_or_none(pdf_path: Path) -> Optional[str]:
+    """PDF'in gomulu metin katmanini dener.
+
+    Sayfa basina yeterli karakter varsa OCR'a hic girmeden metni dondurur
+    (ayni `--- Sayfa i ---` bicimiyle); metin yok veya cok azsa None doner
+    ve cagiran rasterlestirme+OCR yoluna devam eder.
+    """
+    try:
+        import pypdfium2 as pdfium
+    except ImportError:
+        return None
 
+    try:
+        document = pdfium.PdfDocument(str(pdf_path))
+    except Exception as exc:  # noqa: BLE001 - bozuk PDF'de OCR yoluna dusulur
+        logging.debug("PDF metin katmani acilamadi (%s): %s", pdf_path, exc)
+        return None
 
-def extract_from_pdf(reader: easyocr.Reader, pdf_path: Path, dpi: int) -> str:
+    try:
+        page_count = len(document)
+        if page_count == 0:
+            return None
+        chunks: list[str] = []
+        total_chars = 0
+        for index in range(page_count):
+            page = document[index]
+            textpage = page.get_textpage()
+            page_text = textpage.get_text_range().strip()
+            textpage.close()
+            page.close()
+            total_chars += len(page_text)
+            if page_text:
+                chunks.append(f"--- Sayfa {index + 1} ---")
+                chunks.append(page_text)
+        if total_chars / page_count < NATIVE_TEXT_MIN_CHARS_PER_PAGE:
+            return None
+        logging.debug("PDF metin katmani kullanildi (%s karakter): %s", total_chars, pdf_path)
+        return "\n\n".join(chunks)
+    finally:
+        document.close()
+
+
+def iter_pdf_page_arrays(pdf_path: Path, dpi: int, ocr_dpi: int) -> Iterable:
+    """PDF sayfalarini OCR'a hazir gri ton dizileri olarak tembelce uretir.
+
+    pypdfium2 varsa sayfalar alt surec ve JPEG kodlamasi olmadan dogrudan
+    bellekte render edilir; yoksa pdf2image/Poppler ile gecici dosyalar
+    uzerinden ayni akis saglanir.
+    """
+    try:
+        import pypdfium2 as pdfium
+    except ImportError:
+        pdfium = None
+
+    if pdfium is not None:
+        logging.debug("PDF pdfium ile rasterlestiriliyor: %s", pdf_path)
+        document = pdfium.PdfDocument(str(pdf_path))
+        try:
+            for index in range(len(document)):
+                page = document[index]
+                bitmap = page.render(scale=dpi / 72, rev_byteorder=True)
+                array = preprocess_page_array(bitmap.to_numpy()[:, :, :3], dpi, ocr_dpi)
+                page.close()
+                yield array
+        finally:
+            document.close()
+        return
+
+    with tempfile.TemporaryDirectory(prefix="pdfraster_") as raster_dir:
+        for image_path in rasterize_pdf(pdf_path, dpi, Path(raster_dir)):
+            yield preprocess_page_array(image_paths_to_arrays([image_path])[0], dpi, ocr_dpi)
+
+
+def rasterize_pdf(pdf_path: Path, dpi: int, output_dir: Path) -> list:
+    """PDF sayfalarini Poppler ile paralel olarak gecici JPEG dosyalarina
+    rasterlestirir ve yollarini dondurur; sayfalar bellege topluca yuklenmez."""
     try:
         from pdf2image import convert_from_path
     except ImportError as exc:
         raise RuntimeError("pdf2image kutuphanesi eksik: pip install pdf2image") from exc
+
+    logging.debug("PDF rasterlestiriliyor: %s", pdf_path)
+    return convert_from_path(
+        str(pdf_path),
+        dpi=dpi,
+        thread_count=os.cpu_count() or 1,
+        fmt="jpeg",
+        output_folder=str(output_dir),
+        paths_only=True,
+    )
+
+
+def image_paths_to_arrays(image_paths: list) -> list:
+    """Gecici sayfa gorsellerini sirayla numpy dizilerine cevirir ve diskteki
+    kopyalari hemen siler."""
     try:
         import numpy as np
+        from PIL import Image
     except ImportError as exc:
-        raise RuntimeError("numpy kutuphanesi eksik: pip install numpy") from exc
+        raise RuntimeError("numpy ve pillow kutuphaneleri eksik: pip install numpy pillow") from exc
+
+    page_arrays = []
+    for image_path in image_paths:
+        with Image.open(image_path) as image:
+            page_arrays.append(np.asarray(image.convert("RGB")))
+        os.unlink(image_path)
+    return page_arrays
+
+
+def extract_from_pdf(
+    reader: easyocr.Reader,
+    pdf_path: Path,
+    dpi: int,
+    batch_size: int = DEFAULT_OCR_BATCH_SIZE,
+    force_ocr: bool = False,
+    ocr_dpi: int = DEFAULT_OCR_DPI,
+) -> str:
+    if not force_ocr and (native_text := native_text_or_none(pdf_path)) is not None:
+        return native_text
 
     logging.debug("PDF OCR: %s", pdf_path)
-    pages = convert_from_path(str(pdf_path), dpi=dpi)
-    if not pages:
-        return ""
-
-    chunks: list[str] = []
-    for index, page in enumerate(pages, start=1):
-        logging.debug("PDF sayfa %s", index)
-        page_array = np.asarray(page)
-        results = reader.readtext(page_array, detail=0, paragraph=True)
-        page_lines = [line.strip() for line in results if line and line.strip()]
-        if page_lines:
-            chunks.append(f"--- Sayfa {index} ---")
-            chunks.append("\n".join(page_lines))
-    return "\n\n".join(chunks)
-
-
-def convert_pptx_to_pdf(pptx_path: Path, temp_dir: Path) -> Path:
+    return _ocr_page_stream(reader, iter_pdf_page_arrays(pdf_path, dpi, ocr_dpi), batch_size)
+
+
+class ThreadedOcrPipeline:
+    """CPU hazirlik adimlarini (rasterlestirme, pptx donusumu, gri ton) bir
+    is parcacigi havuzunda GPU OCR ile ortusturur. Hazirlik dosya basina
+    `_prepare` isi olarak havuza verilir; tek Reader'a sahip ana is parcacigi
+    sonuclari bittikce okuyup yazar. Sinirli prefetch penceresi ayni anda
+    bellekte tutulan hazirlanmis dosya sayisini sinirlar.
+    """
+
+    PREFETCH = 4
+
+    def __init__(
+        self,
+        reader: easyocr.Reader,
+        args: argparse.Namespace,
+        tmp_dir: Path,
+        should_stop: Optional[Callable[[], bool]] = None,
+    ) -> None:
+        self.reader = reader
+        self.args = args
+        self.tmp_dir = tmp_dir
+        self.should_stop = should_stop or (lambda: False)
+        self.processed = 0
+        self.skipped = 0
+
+    def run(self, work_items: list) -> tuple[int, int]:
+        iterator = iter(work_items)
+        pending: dict = {}
+        files_done = 0
+
+        with ThreadPoolExecutor(max_workers=os.cpu_count() or 1) as pool:
+
+            def submit_next() -> None:
+                if self.should_stop():
+                    return
+                try:
+                    file_path, output_path = next(iterator)
+                except StopIteration:
+                    return
+                pending[pool.submit(self._prepare, file_path)] = (file_path, output_path)
+
+            for _ in range(self.PREFETCH):
+                submit_next()
+
+            while pending:
+                completed, _ = wait(set(pending), return_when=FIRST_COMPLETED)
+                for future in completed:
+                    file_path, output_path = pending.pop(future)
+                    submit_next()
+                    try:
+                        kind, data = future.result()
+                    except Exception as exc:  # noqa: BLE001
+                        logging.error("Islenemedi (%s): %s", file_path, exc)
+                        self.skipped += 1
+                        continue
+
+                    if self.should_stop():
+                        self.skipped += 1
+                        continue
+
+                    files_done += 1
+                    _maybe_empty_cache(files_done, self.args.empty_cache_every)
+                    logging.info("OCR: %s", file_path)
+                    try:
+                        if kind == "text":
+                            text = data
+                        elif kind == "pages":
+                            text = ocr_page_arrays(self.reader, data, self.args.ocr_batch_size)
+                        else:
+                            text = ocr_image_array(self.reader, data)
+                    except Exception as exc:  # noqa: BLE001
+                        logging.error("Islenemedi (%s): %s", file_path, exc)
+                        self.skipped += 1
+                        continue
+
+                    stripped = text.strip()
+                    if len(stripped) < self.args.min_length:
+                        logging.info(
+                            "Cikti cok kisa oldugu icin yazilmiyor (%s karakter): %s",
+                            len(stripped),
+                            file_path,
+                        )
+                        self.skipped += 1
+                        continue
+
+                    write_output(output_path, stripped)
+                    self.processed += 1
+
+        return self.processed, self.skipped
+
+    def _prepare(self, file_path: Path):
+        """CPU hazirligi: (kind, data) dondurur; kind "text" (hazir metin),
+        "pages" (gri ton sayfa dizileri) veya "image" (tek dizi) olabilir."""
+        suffix = file_path.suffix.lower()
+        if suffix in SUPPORTED_PDF_EXT:
+            if not self.args.force_ocr and (native_text := native_text_or_none(file_path)) is not None:
+                return "text", native_text
+            return "pages", list(iter_pdf_page_arrays(file_path, self.args.dpi, self.args.ocr_dpi))
+        if suffix in SUPPORTED_PPTX_EXT:
+            image_paths = convert_pptx_to_images(file_path, self.tmp_dir, self.args.dpi)
+            try:
+                return "pages", [
+                    preprocess_page_array(array, self.args.dpi, self.args.ocr_dpi)
+                    for array in image_paths_to_arrays(image_paths)
+                ]
+            finally:
+                for image_path in image_paths:
+                    image_path.unlink(missing_ok=True)
+
+        try:
+            import numpy as np
+            from PIL import Image
+        except ImportError as exc:
+            raise RuntimeError("numpy ve pillow kutuphaneleri eksik: pip install numpy pillow") from exc
+
+        with Image.open(file_path) as image:
+            return "image", preprocess_page_array(np.asarray(image.convert("RGB")))
+
+
+def convert_pptx_to_images(pptx_path: Path, temp_dir: Path, dpi: int) -> list:
+    """pptx slaytlarini PDF'e ugramadan dogrudan gecici PNG dosyalarina
+    cevirir; cift rasterlestirme (Aspose PDF + Poppler) ortadan kalkar."""
     try:
         import aspose.slides as slides
-        from aspose.slides.export import SaveFormat
     except ImportError as exc:
         raise RuntimeError(
-            "pptx dosyalarini PDF'e cevirirken aspose.slides paketi gerekli: pip install aspose.slides"
+            "pptx dosyalarini gorsele cevirirken aspose.slides paketi gerekli: pip install aspose.slides"
         ) from exc
 
-    pdf_path = temp_dir / (pptx_path.stem + ".pdf")
+    scale = dpi / 96.0  # Aspose slayt boyutlarini 96 DPI varsayar
+    image_paths: list[Path] = []
     with slides.Presentation(str(pptx_path)) as presentation:
-        presentation.save(str(pdf_path), SaveFormat.PDF)
-    return pdf_path
+        for index, slide in enumerate(presentation.slides, start=1):
+            image_path = temp_dir / f"{pptx_path.stem}_slide_{index}.png"
+            slide.get_image(scale, scale).save(str(image_path), slides.ImageFormat.PNG)
+            image_paths.append(image_path)
+    return image_paths
+
+
+def _ocr_page_stream(reader: easyocr.Reader, arrays_iter: Iterable, batch_size: int) -> str:
+    """Sayfa dizisi akisini batch batch OCR'lar; bellekte ayni anda en fazla
+    batch_size sayfa dizisi tutulur."""
+    chunks: list[str] = []
+    page_index = 0
+    batch: list = []
+    for array in arrays_iter:
+        batch.append(array)
+        if len(batch) == batch_size:
+            results_per_page = _readtext_batched_oom_safe(reader, batch, batch_size)
+            chunks.extend(_page_chunks(results_per_page, page_index + 1))
+            page_index += len(batch)
+            batch = []
+    if batch:
+        results_per_page = _readtext_batched_oom_safe(reader, batch, batch_size)
+        chunks.extend(_page_chunks(results_per_page, page_index + 1))
+    return "\n\n".join(chunks)
+
+
+def _ocr_image_paths(reader: easyocr.Reader, image_paths: list, dpi: int, batch_size: int, ocr_dpi: int) -> str:
+    arrays_iter = (
+        preprocess_page_array(image_paths_to_arrays([image_path])[0], dpi, ocr_dpi)
+        for image_path in image_paths
+    )
+    return _ocr_page_stream(reader, arrays_iter, batch_size)
+
+
+def extract_from_pptx(
+    reader: easyocr.Reader,
+    pptx_path: Path,
+    temp_dir: Path,
+    dpi: int,
+    batch_size: int = DEFAULT_OCR_BATCH_SIZE,
+    ocr_dpi: int = DEFAULT_OCR_DPI,
+) -> str:
+    logging.debug("PPTX OCR: %s", pptx_path)
+    image_paths = convert_pptx_to_images(pptx_path, temp_dir, dpi)
+    if not image_paths:
+        return ""
+    try:
+        return _ocr_image_paths(reader, image_paths, dpi, batch_size, ocr_dpi)
+    finally:
+        # Hata durumunda bile ara PNG'ler birikmesin; normal akista decode
+        # sonrasi zaten silinmis olurlar.
+        for image_path in image_paths:
+            image_path.unlink(missing_ok=True)
+
+
+def auto_worker_count(use_gpu: bool) -> int:
+    """Bos VRAM'e gore surec sayisi secer; her Reader kopyasi ~3 GiB sayilir."""
+    if not use_gpu:
+        return 1
+    try:
+        import torch
+
+        free_bytes, _ = torch.cuda.mem_get_info()
+    except Exception:  # noqa: BLE001 - olculemezse tek surece dusulur
+        return 1
+    return max(1, min(4, int(free_bytes // (3 * 1024**3))))
+
+
+def _worker_main(in_q, out_q, use_gpu: bool, args: argparse.Namespace) -> None:
+    """Tek OCR sureci: kendi Reader'ini kurar ve kuyruktan dosya tuketir."""
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
+    try:
+        reader = build_reader(use_gpu, args.precision)
+    except Exception as exc:  # noqa: BLE001
+        out_q.put((None, None, None, f"EasyOCR baslatilamadi: {exc}"))
+        return
+
+    with tempfile.TemporaryDirectory(prefix="pptx2img_") as tmp_dir:
+        tmp_dir_path = Path(tmp_dir)
+        files_done = 0
+        while True:
+            item = in_q.get()
+            if item is None:
+                return
+            files_done += 1
+            _maybe_empty_cache(files_done, args.empty_cache_every)
+            file_str, output_str = item
+            file_path = Path(file_str)
+            suffix = file_path.suffix.lower()
+            try:
+                if suffix in SUPPORTED_PDF_EXT:
+                    text = extract_from_pdf(
+                        reader, file_path, args.dpi, args.ocr_batch_size, args.force_ocr, args.ocr_dpi
+                    )
+                elif suffix in SUPPORTED_PPTX_EXT:
+                    text = extract_from_pptx(
+                        reader, file_path, tmp_dir_path, args.dpi, args.ocr_batch_size, args.ocr_dpi
+                    )
+                else:
+                    text = extract_from_image(reader, file_path)
+            except Exception as exc:  # noqa: BLE001
+                out_q.put((file_str, output_str, None, str(exc)))
+                continue
+            out_q.put((file_str, output_str, text, None))
+
+
+class WorkerPool:
+    """N ayri surecte birer easyocr.Reader calistirir; PyTorch thread-safe
+    olmadigi icin paylasilan tek Reader yerine her surec kendi model
+    kopyasini tutar. Dosyalar in_q ile dagitilir, metinler out_q ile ana
+    surece doner ve ciktilari ana surec yazar. CUDA fork ile uyumsuz
+    oldugundan 'spawn' baslatma yontemi kullanilir.
+    """
+
+    def __init__(self, worker_count: int, use_gpu: bool, args: argparse.Namespace) -> None:
+        ctx = multiprocessing.get_context("spawn")
+        self.in_q = ctx.Queue()
+        self.out_q = ctx.Queue()
+        self.workers = [
+            ctx.Process(
+                target=_worker_main,
+                args=(self.in_q, self.out_q, use_gpu, args),
+                name=f"ocr-worker-{index}",
+                daemon=True,
+            )
+            for index in range(worker_count)
+        ]
+        for worker in self.workers:
+            worker.start()
+        atexit.register(self.terminate)
+
+    def run(self, work_items: list, min_length: int) -> tuple[int, int]:
+        for file_path, output_path in work_items:
+            self.in_q.put((str(file_path), str(output_path)))
+
+        processed = 0
+        skipped = 0
+        for _ in work_items:
+            file_str, output_str, text, error = self.out_q.get()
+            if file_str is None:
+                raise RuntimeError(error)
+            if error is not None:
+                logging.error("Islenemedi (%s): %s", file_str, error)
+                skipped += 1
+                continue
+            stripped = text.strip()
+            if len(stripped) < min_length:
+                logging.info(
+                    "Cikti cok kisa oldugu icin yazilmiyor (%s karakter): %s",
+                    len(stripped),
+                    file_str,
+                )
+                skipped += 1
+                continue
+            write_output(Path(output_str), stripped)
+            processed += 1
+        return processed, skipped
+
+    def close(self) -> None:
+        for _ in self.workers:
+            self.in_q.put(None)
+        for worker in self.workers:
+            worker.join(timeout=10)
+        self.terminate()
+
+    def terminate(self) -> None:
+        for worker in self.workers:
+            if worker.is_alive():
+                worker.terminate()
 
 
 def find_files(root: Path) -> Iterable[Path]:
-    for path in root.rglob("*"):
-        if path.is_file() and path.suffix.lower() in SUPPORTED_EXTENSIONS:
-            yield path
+    """Desteklenen dosyalari os.walk ile tarar; rglob'un her girdi icin Path
+    kurup stat cagirmasindan kacinir, buyuk arsivlerde kat kat hizlidir."""
+    for dirpath, _, fnames in os.walk(root, followlinks=False):
+        for fname in fnames:
+            if "." in fname and fname.rpartition(".")[2].lower() in SUPPORTED_EXTENSIONS_NODOT:
+                yield Path(dirpath, fname)
 
 
 def relative_output_path(file_path: Path, source_root: Path, output_root: Path) -> Path:
@@ -151,17 +758,22 @@ def relative_output_path(file_path: Path, source_root: Path, output_root: Path)
     return output_root.joinpath(rel).with_suffix(".txt")
 
 
-def ensure_directory(path: Path) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
+def write_output(output_path: Path, text: str) -> None:
+    with open(output_path, "wb") as handle:
+        handle.write(text.encode("utf-8"))
 
 
-def main() -> int:
-    args = parse_args()
-    logging.basicConfig(
-        level=logging.DEBUG if args.verbose else logging.INFO,
-        format="[%(levelname)s] %(message)s",
-    )
+def run_ocr(
+    args: argparse.Namespace,
+    use_gpu: bool,
+    reader: Optional[easyocr.Reader] = None,
+    should_stop: Optional[Callable[[], bool]] = None,
+) -> int:
+    """Ayristirilmis argumanlarla OCR akisini calistirir.
 
+    `reader` verilirse onceden kurulmus Reader tek surecli pipeline ile
+    kullanilir; verilmezse gerekirse kurulur veya surec havuzu acilir.
+    """
     source_root = Path(args.source).expanduser().resolve()
     if not source_root.exists() or not source_root.is_dir():
         logging.error("Kaynak klasor bulunamadi: %s", source_root)
@@ -174,17 +786,10 @@ def main() -> int:
     )
     output_root.mkdir(parents=True, exist_ok=True)
 
-    try:
-        use_gpu = select_device(args.device)
-    except RuntimeError as exc:
-        logging.error(str(exc))
-        return 1
-
-    try:
-        reader = build_reader(use_gpu)
-    except Exception as exc:
-        logging.error("EasyOCR baslatilamadi: %s", exc)
-        return 1
+    if reader is not None:
+        worker_count = 1
+    else:
+        worker_count = args.workers if args.workers > 0 else auto_worker_count(use_gpu)
 
     files = list(find_files(source_root))
     if not files:
@@ -193,57 +798,89 @@ def main() -> int:
 
     logging.info("%s dosya isleniyor...", len(files))
     skipped = 0
-    processed = 0
-
-    with tempfile.TemporaryDirectory(prefix="pptx2pdf_") as tmp_dir:
-        tmp_dir_path = Path(tmp_dir)
 
-        for file_path in files:
+    # Var olan ciktilar tek taramada toplanir; dosya basina stat cagrisi
+    # yerine kume uyeligi kontrol edilir.
+    existing: set[Path] = set()
+    if not args.force:
+        existing = {path.relative_to(output_root) for path in output_root.rglob("*.txt")}
+
+    work_items: list[tuple[Path, Path]] = []
+    for file_path in files:
+        try:
+            output_path = relative_output_path(file_path, source_root, output_root)
+        except ValueError:
+            logging.warning("Dosya kaynak klasorden ayristirilamadi, atlandi: %s", file_path)
+            skipped += 1
+            continue
+
+        if not args.force and output_path.relative_to(output_root) in existing:
+            logging.debug("Zaten var, atlaniyor: %s", output_path)
+            skipped += 1
+            continue
+
+        work_items.append((file_path, output_path))
+
+    # Ayni klasore dusen ciktilar icin mkdir bir kez calisir; dosya basina
+    # stat+mkdir sistem cagrilarindan kacinilir.
+    for parent in {output_path.parent for _, output_path in work_items}:
+        parent.mkdir(parents=True, exist_ok=True)
+
+    if worker_count > 1:
+        logging.info("%s OCR sureci baslatiliyor...", worker_count)
+        pool = WorkerPool(worker_count, use_gpu, args)
+        try:
+            processed, pool_skipped = pool.run(work_items, args.min_length)
+        except RuntimeError as exc:
+            logging.error(str(exc))
+            return 1
+        finally:
+            pool.close()
+        skipped += pool_skipped
+    else:
+        if reader is None:
             try:
-                output_path = relative_output_path(file_path, source_root, output_root)
-            except ValueError:
-                logging.warning("Dosya kaynak klasorden ayristirilamadi, atlandi: %s", file_path)
-                skipped += 1
-                continue
-
-            if output_path.exists() and not args.force:
-                logging.debug("Zaten var, atlaniyor: %s", output_path)
-                skipped += 1
-                continue
-
-            logging.info("OCR: %s", file_path)
-            suffix = file_path.suffix.lower()
-
-            try:
-                if suffix in SUPPORTED_PDF_EXT:
-                    text = extract_from_pdf(reader, file_path, args.dpi)
-                elif suffix in SUPPORTED_PPTX_EXT:
-                    pdf_path = convert_pptx_to_pdf(file_path, tmp_dir_path)
-                    text = extract_from_pdf(reader, pdf_path, args.dpi)
-                else:
-                    text = extract_from_image(reader, file_path)
+                reader = get_reader(use_gpu, args.precision)
             except Exception as exc:
-                logging.error("Islenemedi (%s): %s", file_path, exc)
-                skipped += 1
-                continue
+                logging.error("EasyOCR baslatilamadi: %s", exc)
+                return 1
 
-            if len(text.strip()) < args.min_length:
-                logging.info(
-                    "Cikti cok kisa oldugu icin yazilmiyor (%s karakter): %s",
-                    len(text.strip()),
-                    file_path,
-                )
-                skipped += 1
-                continue
-
-            ensure_directory(output_path)
-            output_path.write_text(text, encoding="utf-8")
-            processed += 1
+        with tempfile.TemporaryDirectory(prefix="pptx2img_") as tmp_dir:
+            pipeline = ThreadedOcrPipeline(reader, args, Path(tmp_dir), should_stop=should_stop)
+            processed, pipeline_skipped = pipeline.run(work_items)
+        skipped += pipeline_skipped
 
     logging.info("Islem tamamlandi: %s dosya yazildi, %s dosya atlandi.", processed, skipped)
     logging.info("Ciktilar: %s", output_root)
     return 0
 
 
+def main_with_reader(
+    reader: easyocr.Reader,
+    args: argparse.Namespace,
+    should_stop: Optional[Callable[[], bool]] = None,
+) -> int:
+    """Surec ici giris noktasi: GUI gibi cagiranlarin oturumlar arasinda
+    sakladigi Reader ile OCR akisini calistirir (model yukleme bedeli
+    yalnizca ilk calistirmada odenir)."""
+    return run_ocr(args, use_gpu=False, reader=reader, should_stop=should_stop)
+
+
+def main() -> int:
+    args = parse_args()
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format="[%(levelname)s] %(message)s",
+    )
+
+    try:
+        use_gpu = select_device(args.device)
+    except RuntimeError as exc:
+        logging.error(str(exc))
+        return 1
+
+    return run_ocr(args, use_gpu)
+
+
 if __name__ == "__main__":
     sys.exit(main())
@@ -1,6 +1,8 @@
 ﻿"""Tkinter GUI for Drive fetch, OCR, and Gemini analysis"""
 from __future__ import annotations
 
+import argparse
+import logging
 import queue
 import subprocess
 import sys
@@ -15,6 +17,13 @@ REPO_ROOT = Path(__file__).resolve().parent
 DRIVE_SCRIPT = REPO_ROOT / "drive_fetch.py"
 OCR_SCRIPT = REPO_ROOT / "gpu_turkish_ocr.py"
 ANALYZE_SCRIPT = REPO_ROOT / "analyze_ocr_outputs.py"
+# Log panelinde tutulacak en fazla satir; ustu kirpilir ki Tk cizimi
+# gorunur pencereyle sinirli kalsin.
+MAX_LOG_LINES = 5000
+# CommandThread satirlari bu boyutta ya da bu aralikta topluca kuyruga atar.
+LOG_FLUSH_LINES = 32
+LOG_FLUSH_SECONDS = 0.05
+
 DEFAULT_MODELS = [
     "gemini-2.5-flash",
     "gemini-2.5-pro",
@@ -48,9 +57,37 @@ class CommandThread(threading.Thread):
             return
 
         assert self.process.stdout is not None
+        chunk: List[str] = []
+        chunk_lock = threading.Lock()
+        flush_timer: Optional[threading.Timer] = None
+
+        def flush() -> None:
+            nonlocal flush_timer
+            # put kilit altinda kalir: bosaltma ve yayinlama atomiktir, zamanlayici
+            # ile okuyucu is parcacigi bloklari sira disi yayinlayamaz.
+            with chunk_lock:
+                if flush_timer is not None:
+                    flush_timer.cancel()
+                    flush_timer = None
+                if not chunk:
+                    return
+                self.log_queue.put("\n".join(chunk))
+                chunk.clear()
+
         with self.process.stdout:
             for line in self.process.stdout:
-                self.log_queue.put(line.rstrip("\n"))
+                with chunk_lock:
+                    chunk.append(line.rstrip("\n"))
+                    full = len(chunk) >= LOG_FLUSH_LINES
+                    if not full and flush_timer is None:
+                        # Parti dolmazsa zamanlayici kalan satirlari bosaltir; son
+                        # satir uzun bir sessizlikte bile GUI'ye ulasir.
+                        flush_timer = threading.Timer(LOG_FLUSH_SECONDS, flush)
+                        flush_timer.daemon = True
+                        flush_timer.start()
+                if full:
+                    flush()
+        flush()
         ret = self.process.wait()
         self.on_finish(ret)
 
@@ -59,6 +96,60 @@ class CommandThread(threading.Thread):
             self.process.terminate()
 
 
+class QueueLogHandler(logging.Handler):
+    """logging kayitlarini GUI log kuyruguna aktarir."""
+
+    def __init__(self, log_queue: "queue.Queue[str]") -> None:
+        super().__init__()
+        self.log_queue = log_queue
+        self.setFormatter(logging.Formatter("[%(levelname)s] %(message)s"))
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.log_queue.put(self.format(record))
+
+
+class OcrThread(threading.Thread):
+    """OCR'i surec ici calistirir; Reader gpu_turkish_ocr.get_reader
+    onbelleginden gelir, model yukleme bedeli yalnizca ilk calistirmada
+    odenir."""
+
+    def __init__(
+        self,
+        args: argparse.Namespace,
+        use_gpu: bool,
+        log_queue: "queue.Queue[str]",
+        on_finish,
+    ) -> None:
+        super().__init__(daemon=True)
+        self.args = args
+        self.use_gpu = use_gpu
+        self.log_queue = log_queue
+        self.on_finish = on_finish
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        import gpu_turkish_ocr
+
+        handler = QueueLogHandler(self.log_queue)
+        root_logger = logging.getLogger()
+        root_logger.addHandler(handler)
+        root_logger.setLevel(logging.DEBUG if self.args.verbose else logging.INFO)
+        try:
+            reader = gpu_turkish_ocr.get_reader(self.use_gpu)
+            code = gpu_turkish_ocr.main_with_reader(
+                reader, self.args, should_stop=self._stop_event.is_set
+            )
+        except Exception as exc:  # noqa: BLE001
+            self.log_queue.put(f"OCR calistirilamadi: {exc}")
+            code = -1
+        finally:
+            root_logger.removeHandler(handler)
+        self.on_finish(code)
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+
 class MainWindow(tk.Tk):
     def __init__(self) -> None:
         super().__init__()
@@ -67,7 +158,7 @@ class MainWindow(tk.Tk):
         self.minsize(780, 560)
 
         self.log_queue: "queue.Queue[str]" = queue.Queue()
-        self.current_runner: Optional[CommandThread] = None
+        self.current_runner: Optional[CommandThread | OcrThread] = None
 
         self._build_ui()
         self.after(100, self._poll_log_queue)
@@ -247,9 +338,12 @@ class MainWindow(tk.Tk):
         if path:
             var.set(path)
 
-    def _append_log(self, line: str) -> None:
+    def _append_log(self, block: str) -> None:
         self.log_text.configure(state=tk.NORMAL)
-        self.log_text.insert(tk.END, line + "\n")
+        self.log_text.insert(tk.END, block + "\n")
+        line_count = int(self.log_text.index("end-1c").split(".")[0])
+        if line_count > MAX_LOG_LINES:
+            self.log_text.delete("1.0", f"{line_count - MAX_LOG_LINES + 1}.0")
         self.log_text.see(tk.END)
         self.log_text.configure(state=tk.DISABLED)
 
@@ -259,13 +353,14 @@ class MainWindow(tk.Tk):
         self.log_text.configure(state=tk.DISABLED)
 
     def _poll_log_queue(self) -> None:
+        pending: List[str] = []
         while True:
             try:
-                msg = self.log_queue.get_nowait()
+                pending.append(self.log_queue.get_nowait())
             except queue.Empty:
                 break
-            else:
-                self._append_log(msg)
+        if pending:
+            self._append_log("\n".join(pending))
         self.after(100, self._poll_log_queue)
 
     def _stop_current(self) -> None:
@@ -305,19 +400,56 @@ class MainWindow(tk.Tk):
         if not source:
             messagebox.showerror("Eksik bilgi", "Kaynak klasor secin.")
             return
+        try:
+            dpi = int(self.dpi_var.get().strip() or "220")
+            min_length = int(self.min_length_var.get().strip() or "0")
+        except ValueError:
+            messagebox.showerror("Hatali deger", "DPI ve minimum uzunluk sayi olmali.")
+            return
+        device = self.device_var.get().strip() or "auto"
+
+        try:
+            import gpu_turkish_ocr
+        except Exception as exc:  # noqa: BLE001 - easyocr yoksa komut satiri yoluna dusulur
+            self.log_queue.put(f"[Uyari] Surec ici OCR kullanilamiyor ({exc}); ayri surec baslatiliyor.")
+            self._start_ocr_subprocess(source, device, dpi, min_length)
+            return
+
+        try:
+            use_gpu = gpu_turkish_ocr.select_device(device)
+        except RuntimeError as exc:
+            messagebox.showerror("GPU hatasi", str(exc))
+            return
+
+        args = argparse.Namespace(
+            source=source,
+            output=self.output_var.get().strip() or None,
+            dpi=dpi,
+            device=device,
+            ocr_batch_size=gpu_turkish_ocr.DEFAULT_OCR_BATCH_SIZE,
+            ocr_dpi=gpu_turkish_ocr.DEFAULT_OCR_DPI,
+            workers=1,
+            precision="fp16",
+            empty_cache_every=20,
+            force=self.force_var.get(),
+            force_ocr=False,
+            min_length=min_length,
+            verbose=self.verbose_var.get(),
+        )
+        self._launch_runner(
+            lambda on_finish: OcrThread(args, use_gpu, self.log_queue, on_finish),
+            self.ocr_button,
+        )
+
+    def _start_ocr_subprocess(self, source: str, device: str, dpi: int, min_length: int) -> None:
         cmd = [sys.executable, str(OCR_SCRIPT), source]
         output = self.output_var.get().strip()
         if output:
             cmd.extend(["--output", output])
-        device = self.device_var.get().strip()
-        if device:
-            cmd.extend(["--device", device])
-        dpi = self.dpi_var.get().strip()
-        if dpi:
-            cmd.extend(["--dpi", dpi])
-        min_len = self.min_length_var.get().strip()
-        if min_len and min_len != "0":
-            cmd.extend(["--min-length", min_len])
+        cmd.extend(["--device", device])
+        cmd.extend(["--dpi", str(dpi)])
+        if min_length:
+            cmd.extend(["--min-length", str(min_length)])
         if self.force_var.get():
             cmd.append("--force")
         if self.verbose_var.get():
@@ -361,6 +493,9 @@ class MainWindow(tk.Tk):
         self._run_command(cmd, self.analysis_button)
 
     def _run_command(self, cmd: List[str], button: ttk.Button) -> None:
+        self._launch_runner(lambda on_finish: CommandThread(cmd, self.log_queue, on_finish), button)
+
+    def _launch_runner(self, make_runner, button: ttk.Button) -> None:
         def on_finish(code: int) -> None:
             if code == 0:
                 self.log_queue.put("[Tamamlandi]")
@@ -370,7 +505,7 @@ class MainWindow(tk.Tk):
             button.configure(state=tk.NORMAL)
 
         button.configure(state=tk.DISABLED)
-        self.current_runner = CommandThread(cmd, self.log_queue, on_finish)
+        self.current_runner = make_runner(on_finish)
         self.current_runner.start()
 
 
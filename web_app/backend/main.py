@@ -2,21 +2,34 @@
 from __future__ import annotations
 
 import asyncio
-import subprocess
+import itertools
+import json
+import os
+import shlex
+import signal
 import sys
-import threading
+import time
 import uuid
+from collections import deque
 from dataclasses import dataclass, field
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 from fastapi import FastAPI, HTTPException
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import FileResponse, ORJSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel, Field
 
+try:
+    import uvloop
+
+    uvloop.install()
+except ImportError:
+    pass
+
 REPO_ROOT = Path(__file__).resolve().parents[2]
 DRIVE_SCRIPT = REPO_ROOT / "drive_fetch.py"
 OCR_SCRIPT = REPO_ROOT / "gpu_turkish_ocr.py"
@@ -27,6 +40,15 @@ for script in (DRIVE_SCRIPT, OCR_SCRIPT, ANALYZE_SCRIPT):
     if not script.exists():
         raise RuntimeError(f"Gerekli betik bulunamadi: {script}")
 
+DRIVE_SCRIPT_STR = str(DRIVE_SCRIPT)
+OCR_SCRIPT_STR = str(OCR_SCRIPT)
+ANALYZE_SCRIPT_STR = str(ANALYZE_SCRIPT)
+INDEX_HTML = FRONTEND_DIR / "index.html"
+
+# SSE fanout toplu yapilir: en fazla bu kadar satir ya da bu kadar saniye biriktirilir.
+LOG_FLUSH_LINES = 32
+LOG_FLUSH_SECONDS = 0.010
+
 DEFAULT_MODELS = [
     "gemini-1.5-flash-002",
     "gemini-1.5-pro-002",
@@ -34,14 +56,24 @@ DEFAULT_MODELS = [
     "gemini-pro",
 ]
 
-app = FastAPI(title="GPU Turkish OCR + Gemini Web UI")
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+class _NonStreamGZipMiddleware(GZipMiddleware):
+    """SSE yanitlarini sikistirmadan gecirir.
+
+    zlib tamponu kucuk data: frame'lerini biriktirdigi icin sikistirilmis bir
+    event-stream istemciye gecikmeli paketler halinde ulasir; log akisi donmus
+    gorunur. Stream endpoint'i bu yuzden gzip disinda tutulur.
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] == "http" and scope["path"].endswith("/stream"):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
+# CORS middleware yok: frontend ayni uygulamadan (/static) sunulur, same-origin.
+app = FastAPI(title="GPU Turkish OCR + Gemini Web UI", default_response_class=ORJSONResponse)
+app.add_middleware(_NonStreamGZipMiddleware, minimum_size=1024)
 
 
 @dataclass
@@ -52,53 +84,109 @@ class Job:
     created_at: datetime = field(default_factory=datetime.utcnow)
     status: str = "pending"
     return_code: Optional[int] = None
-    logs: List[str] = field(default_factory=list)
-    _process: Optional[subprocess.Popen] = field(default=None, init=False, repr=False)
-    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+    logs: deque = field(default_factory=lambda: deque(maxlen=2000))
+    _process: Optional[asyncio.subprocess.Process] = field(default=None, init=False, repr=False)
+    _task: Optional[asyncio.Task] = field(default=None, init=False, repr=False)
+    _subscribers: List[asyncio.Queue] = field(default_factory=list, init=False, repr=False)
+    _done: asyncio.Event = field(default_factory=asyncio.Event, init=False, repr=False)
+    _pending: List[str] = field(default_factory=list, init=False, repr=False)
+    _log_seq: int = field(default=0, init=False, repr=False)
+    _flush_handle: Optional[asyncio.TimerHandle] = field(default=None, init=False, repr=False)
+    _loop: Optional[asyncio.AbstractEventLoop] = field(default=None, init=False, repr=False)
 
     def start(self) -> None:
-        threading.Thread(target=self._run, name=f"job-{self.job_id}", daemon=True).start()
+        self._loop = asyncio.get_running_loop()
+        self._task = self._loop.create_task(self._run())
 
     def _append_log(self, line: str) -> None:
-        with self._lock:
-            self.logs.append(line)
-            if len(self.logs) > 2000:
-                self.logs = self.logs[-2000:]
+        # Tek yazar: tum mutasyonlar event loop uzerinde gerceklesir, kilit gerekmez.
+        self.logs.append(line)
+        self._log_seq += 1
+        if not self._subscribers:
+            return
+        # Satirlar patlama halinde gelir; fanout'u toplu yaparak loop uyandirmayi azalt.
+        # Parti dolmazsa zamanlayici kalan satirlari bosaltir; son satir patlamanin
+        # ardindan sessiz bir hesaplama fazi gelse bile aboneye ulasir.
+        self._pending.append(line)
+        if len(self._pending) >= LOG_FLUSH_LINES:
+            self._flush_pending()
+        elif self._flush_handle is None and self._loop is not None:
+            self._flush_handle = self._loop.call_later(LOG_FLUSH_SECONDS, self._flush_pending)
+
+    def _flush_pending(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending:
+            return
+        batch = self._pending
+        self._pending = []
+        for queue in self._subscribers:
+            queue.put_nowait(batch)
 
-    def _run(self) -> None:
+    def _finish_streams(self) -> None:
+        self._flush_pending()
+        for queue in self._subscribers:
+            queue.put_nowait(None)
+
+    async def _run(self) -> None:
         self.status = "running"
-        self._append_log("$ " + " ".join(self.command))
+        self._append_log("$ " + shlex.join(self.command))
         try:
-            self._process = subprocess.Popen(
-                self.command,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
-                bufsize=1,
-            )
-        except Exception as exc:  # noqa: BLE001
-            self.status = "failed"
-            self.return_code = -1
-            self._append_log(f"Komut baslatilamadi: {exc}")
-            return
-
-        assert self._process.stdout is not None
-        with self._process.stdout:
-            for line in self._process.stdout:
-                self._append_log(line.rstrip())
-        self.return_code = self._process.wait()
-        self.status = "completed" if self.return_code == 0 else "failed"
-        self._append_log(f"[Islem tamamlandi, kod={self.return_code}]")
+            try:
+                self._process = await asyncio.create_subprocess_exec(
+                    *self.command,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.STDOUT,
+                    limit=1 << 20,
+                    start_new_session=True,
+                )
+            except Exception as exc:  # noqa: BLE001
+                self.status = "failed"
+                self.return_code = -1
+                self._append_log(f"Komut baslatilamadi: {exc}")
+                return
+
+            assert self._process.stdout is not None
+            async for raw in self._process.stdout:
+                self._append_log(raw.rstrip(b"\n\r").decode("utf-8", "replace"))
+            self.return_code = await self._process.wait()
+            if self.status != "cancelled":
+                self.status = "completed" if self.return_code == 0 else "failed"
+            self._append_log(f"[Islem tamamlandi, kod={self.return_code}]")
+        finally:
+            self._done.set()
+            self._finish_streams()
 
     def cancel(self) -> None:
-        if self._process and self._process.poll() is None:
-            self._process.terminate()
+        if self._process and self._process.returncode is None:
+            # Tum process grubuna SIGTERM; CUDA worker'lar da dahil olmak uzere
+            # 5 saniye icinde cikmazsa SIGKILL ile sonlandirilir.
+            try:
+                os.killpg(self._process.pid, signal.SIGTERM)
+            except ProcessLookupError:
+                return
+            if self._loop:
+                self._loop.call_later(5.0, self._force_kill)
             self.status = "cancelled"
             self._append_log("[Islem iptal edildi]")
 
-    def snapshot(self) -> Dict[str, object]:
-        with self._lock:
+    def _force_kill(self) -> None:
+        if self._process and self._process.returncode is None:
+            try:
+                os.killpg(self._process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+
+    def snapshot(self, since: int = 0) -> Dict[str, object]:
+        # since: istemcinin gordugu son sira numarasi; yalniz sonrasi kopyalanir.
+        delta = self._log_seq - since
+        if delta <= 0:
+            logs_copy: List[str] = []
+        elif delta >= len(self.logs):
             logs_copy = list(self.logs)
+        else:
+            logs_copy = list(itertools.islice(self.logs, len(self.logs) - delta, None))
         return {
             "job_id": self.job_id,
             "job_type": self.job_type,
@@ -107,11 +195,17 @@ class Job:
             "return_code": self.return_code,
             "created_at": self.created_at.isoformat() + "Z",
             "logs": logs_copy,
+            "next": self._log_seq,
         }
 
 
+# Kilitsiz: dict ekleme/okuma GIL altinda atomiktir ve tum erisim loop uzerindedir.
 jobs: Dict[str, Job] = {}
-jobs_lock = threading.Lock()
+# Surec basina tek uuid + sayac: job basina /dev/urandom okumasi yapilmaz.
+_PROC_PREFIX = uuid.uuid4().hex[:8]
+_job_counter = itertools.count()
+# Kayit sirasina gore; joblar sonradan tarihlenmez, liste bastan siralidir.
+job_order: List[Job] = []
 
 
 class DrivePayload(BaseModel):
@@ -153,26 +247,20 @@ class JobResponse(BaseModel):
     status: str
 
 
-class JobDetail(BaseModel):
-    job_id: str
-    job_type: str
-    status: str
-    return_code: Optional[int]
-    command: List[str]
-    created_at: str
-    logs: List[str]
-
-
 class DefaultsResponse(BaseModel):
     models: List[str]
 
 
 @app.get("/", include_in_schema=False)
 async def root() -> FileResponse:
-    return FileResponse(FRONTEND_DIR / "index.html")
+    return FileResponse(INDEX_HTML)
 
 
-app.mount("/static", StaticFiles(directory=FRONTEND_DIR / "static"), name="static")
+app.mount(
+    "/static",
+    StaticFiles(directory=FRONTEND_DIR / "static", check_dir=False, html=True),
+    name="static",
+)
 
 
 @app.get("/api/defaults", response_model=DefaultsResponse)
@@ -180,33 +268,66 @@ async def defaults() -> DefaultsResponse:
     return DefaultsResponse(models=DEFAULT_MODELS)
 
 
+@lru_cache(maxsize=256)
+def _resolve_path(raw: str) -> Path:
+    return Path(raw).expanduser().resolve()
+
+
+# Ayni konfigurasyonla tekrarlanan gonderimlerde stat cagrilarini kisa sureli onbellekle.
+_EXISTS_TTL_SECONDS = 2.0
+_exists_cache: Dict[Tuple[str, bool], Tuple[float, bool]] = {}
+
+
+def _cached_exists(path: Path, must_be_dir: bool = False) -> bool:
+    key = (str(path), must_be_dir)
+    now = time.monotonic()
+    cached = _exists_cache.get(key)
+    if cached is not None and now - cached[0] < _EXISTS_TTL_SECONDS:
+        return cached[1]
+    ok = path.is_dir() if must_be_dir else path.exists()
+    _exists_cache[key] = (now, ok)
+    return ok
+
+
+def _checked_file(raw: str, detail: str) -> Path:
+    path = _resolve_path(raw)
+    if not _cached_exists(path):
+        raise HTTPException(status_code=400, detail=detail)
+    return path
+
+
+def _checked_dir(raw: str, detail: str) -> Path:
+    path = _resolve_path(raw)
+    if not _cached_exists(path, must_be_dir=True):
+        raise HTTPException(status_code=400, detail=detail)
+    return path
+
+
 def _register_job(command: List[str], job_type: str) -> Job:
-    job = Job(job_id=str(uuid.uuid4()), command=command, job_type=job_type)
-    with jobs_lock:
-        jobs[job.job_id] = job
+    job = Job(job_id=f"{_PROC_PREFIX}-{next(_job_counter)}", command=command, job_type=job_type)
+    jobs[job.job_id] = job
+    job_order.append(job)
     job.start()
     return job
 
 
 @app.post("/api/run-drive", response_model=JobResponse)
 async def run_drive(payload: DrivePayload) -> JobResponse:
-    dest = Path(payload.destination).expanduser().resolve()
-    sa_path = Path(payload.service_account).expanduser().resolve()
-    if not sa_path.exists():
-        raise HTTPException(status_code=400, detail="Service account dosyasi bulunamadi")
+    dest = await asyncio.to_thread(_resolve_path, payload.destination)
+    sa_path = await asyncio.to_thread(
+        _checked_file, payload.service_account, "Service account dosyasi bulunamadi"
+    )
 
     cmd = [
         sys.executable,
-        str(DRIVE_SCRIPT),
+        DRIVE_SCRIPT_STR,
         payload.folder_id,
         str(dest),
         "--service-account",
         str(sa_path),
+        *(("--overwrite",) if payload.overwrite else ()),
+        *(("--verbose",) if payload.verbose else ()),
     ]
-    if payload.overwrite:
-        cmd.append("--overwrite")
-    if payload.verbose:
-        cmd.append("--verbose")
 
     job = _register_job(cmd, "drive")
     return JobResponse(job_id=job.job_id, status=job.status)
@@ -214,21 +335,24 @@ async def run_drive(payload: DrivePayload) -> JobResponse:
 
 @app.post("/api/run-ocr", response_model=JobResponse)
 async def run_ocr(payload: OCRPayload) -> JobResponse:
-    source_path = Path(payload.source).expanduser().resolve()
-    if not source_path.exists() or not source_path.is_dir():
-        raise HTTPException(status_code=400, detail="Kaynak klasor bulunamadi")
-
-    cmd = [sys.executable, str(OCR_SCRIPT), str(source_path)]
-    if payload.output:
-        cmd.extend(["--output", str(Path(payload.output).expanduser().resolve())])
-    cmd.extend(["--device", payload.device])
-    cmd.extend(["--dpi", str(payload.dpi)])
-    if payload.min_length:
-        cmd.extend(["--min-length", str(payload.min_length)])
-    if payload.force:
-        cmd.append("--force")
-    if payload.verbose:
-        cmd.append("--verbose")
+    source_path = await asyncio.to_thread(
+        _checked_dir, payload.source, "Kaynak klasor bulunamadi"
+    )
+
+    output_path = await asyncio.to_thread(_resolve_path, payload.output) if payload.output else None
+    cmd = [
+        sys.executable,
+        OCR_SCRIPT_STR,
+        str(source_path),
+        *(("--output", str(output_path)) if output_path else ()),
+        "--device",
+        payload.device,
+        "--dpi",
+        str(payload.dpi),
+        *(("--min-length", str(payload.min_length)) if payload.min_length else ()),
+        *(("--force",) if payload.force else ()),
+        *(("--verbose",) if payload.verbose else ()),
+    ]
 
     job = _register_job(cmd, "ocr")
     return JobResponse(job_id=job.job_id, status=job.status)
@@ -236,17 +360,16 @@ async def run_ocr(payload: OCRPayload) -> JobResponse:
 
 @app.post("/api/run-analysis", response_model=JobResponse)
 async def run_analysis(payload: AnalysisPayload) -> JobResponse:
-    root_path = Path(payload.output_root).expanduser().resolve()
-    if not root_path.exists() or not root_path.is_dir():
-        raise HTTPException(status_code=400, detail="OCR cikti klasoru bulunamadi")
-
-    sa_path = Path(payload.service_account).expanduser().resolve()
-    if not sa_path.exists():
-        raise HTTPException(status_code=400, detail="Service account dosyasi bulunamadi")
+    root_path = await asyncio.to_thread(
+        _checked_dir, payload.output_root, "OCR cikti klasoru bulunamadi"
+    )
+    sa_path = await asyncio.to_thread(
+        _checked_file, payload.service_account, "Service account dosyasi bulunamadi"
+    )
 
     cmd = [
         sys.executable,
-        str(ANALYZE_SCRIPT),
+        ANALYZE_SCRIPT_STR,
         str(root_path),
         "--prompt",
         payload.prompt,
@@ -270,37 +393,61 @@ async def run_analysis(payload: AnalysisPayload) -> JobResponse:
         str(payload.top_p),
         "--top-k",
         str(payload.top_k),
+        *(("--verbose",) if payload.verbose else ()),
     ]
 
-    if payload.verbose:
-        cmd.append("--verbose")
-
     job = _register_job(cmd, "analysis")
     return JobResponse(job_id=job.job_id, status=job.status)
 
 
-@app.get("/api/jobs/{job_id}", response_model=JobDetail)
-async def job_detail(job_id: str) -> JobDetail:
-    with jobs_lock:
-        job = jobs.get(job_id)
+@app.get("/api/jobs/{job_id}", response_model=None)
+async def job_detail(job_id: str, since: int = 0) -> Dict[str, object]:
+    job = jobs.get(job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job bulunamadi")
-    return JobDetail(**job.snapshot())
+    return job.snapshot(since)
+
+
+@app.get("/api/jobs/{job_id}/stream", include_in_schema=False)
+async def job_stream(job_id: str) -> StreamingResponse:
+    job = jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job bulunamadi")
+
+    async def event_stream():
+        # Kayit ve geriye donuk kopya arasinda await yok: satir kaybi/cifti olmaz.
+        # Bekleyen parti once eski abonelere gider, yeni abone kopyayi logs'tan alir.
+        queue: asyncio.Queue = asyncio.Queue()
+        job._flush_pending()
+        backlog = list(job.logs)
+        finished = job._task is None or job._task.done()
+        job._subscribers.append(queue)
+        try:
+            if backlog:
+                yield f"data: {json.dumps({'lines': backlog})}\n\n"
+            if finished:
+                return
+            while (batch := await queue.get()) is not None:
+                yield f"data: {json.dumps({'lines': batch})}\n\n"
+        finally:
+            job._subscribers.remove(queue)
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
 
 
-@app.post("/api/jobs/{job_id}/cancel", response_model=JobDetail)
-async def cancel_job(job_id: str) -> JobDetail:
-    with jobs_lock:
-        job = jobs.get(job_id)
+@app.post("/api/jobs/{job_id}/cancel", response_model=None)
+async def cancel_job(job_id: str) -> Dict[str, object]:
+    job = jobs.get(job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job bulunamadi")
     job.cancel()
-    await asyncio.sleep(0.2)
-    return JobDetail(**job.snapshot())
+    try:
+        await asyncio.wait_for(job._done.wait(), timeout=2.0)
+    except asyncio.TimeoutError:
+        pass
+    return job.snapshot()
 
 
-@app.get("/api/jobs", response_model=List[JobDetail])
-async def job_list() -> List[JobDetail]:
-    with jobs_lock:
-        all_jobs = list(jobs.values())
-    return [job.snapshot() for job in sorted(all_jobs, key=lambda j: j.created_at, reverse=True)]
+@app.get("/api/jobs", response_model=None)
+async def job_list() -> List[Dict[str, object]]:
+    return [job.snapshot() for job in reversed(job_order)]
@@ -5,7 +5,8 @@ const cancelButton = document.getElementById("cancel-job");
 const API_BASE = "/api";
 
 let activeJobId = null;
-let jobPollInterval = null;
+let activeJobSeq = 0;
+let logStream = null;
 let jobListInterval = null;
 
 const statusClassMap = {
@@ -79,7 +80,7 @@ function renderJobsList(jobs) {
 
     const title = document.createElement("div");
     title.className = "job-item__title";
-    title.textContent = `${job.job_type.toUpperCase()} • ${job.job_id.slice(0, 8)}`;
+    title.textContent = `${job.job_type.toUpperCase()} • ${job.job_id}`;
 
     const meta = document.createElement("div");
     meta.className = "job-item__meta";
@@ -107,27 +108,46 @@ async function refreshJobs() {
 
 async function selectJob(jobId) {
   activeJobId = jobId;
+  activeJobSeq = 0;
   cancelButton.disabled = false;
-  await updateActiveJob();
-  if (jobPollInterval) clearInterval(jobPollInterval);
-  jobPollInterval = setInterval(updateActiveJob, 2000);
+  await updateActiveJobStatus();
+  openLogStream(jobId);
   const jobs = await fetchJSON(`${API_BASE}/jobs`);
   renderJobsList(jobs);
 }
 
-async function updateActiveJob() {
+function appendLogLines(lines) {
+  if (!lines.length) return;
+  logOutputEl.textContent += (logOutputEl.textContent ? "\n" : "") + lines.join("\n");
+  logOutputEl.scrollTop = logOutputEl.scrollHeight;
+}
+
+function openLogStream(jobId) {
+  if (logStream) logStream.close();
+  logOutputEl.textContent = "";
+  logStream = new EventSource(`${API_BASE}/jobs/${jobId}/stream`);
+  logStream.onmessage = (event) => {
+    appendLogLines(JSON.parse(event.data).lines);
+  };
+  logStream.onerror = () => {
+    // Sunucu akışı kapattı: son durumu bir kez çekip yeniden bağlanmayı engelle.
+    logStream.close();
+    logStream = null;
+    updateActiveJobStatus();
+  };
+}
+
+async function updateActiveJobStatus() {
   if (!activeJobId) return;
   try {
-    const job = await fetchJSON(`${API_BASE}/jobs/${activeJobId}`);
-    activeJobTitleEl.textContent = `${job.job_type.toUpperCase()} • ${job.job_id.slice(0, 8)} • ${job.status}`;
-    logOutputEl.textContent = job.logs.join("\n");
-    logOutputEl.scrollTop = logOutputEl.scrollHeight;
+    const job = await fetchJSON(`${API_BASE}/jobs/${activeJobId}?since=${activeJobSeq}`);
+    activeJobSeq = job.next;
+    activeJobTitleEl.textContent = `${job.job_type.toUpperCase()} • ${job.job_id} • ${job.status}`;
     if (["completed", "failed", "cancelled"].includes(job.status)) {
       cancelButton.disabled = true;
-      if (jobPollInterval) clearInterval(jobPollInterval);
     }
   } catch (error) {
-    console.error("Log alınamadı", error);
+    console.error("Durum alınamadı", error);
   }
 }
 
@@ -136,7 +156,10 @@ function clearActiveJob() {
   activeJobTitleEl.textContent = "Log akışı";
   logOutputEl.textContent = "Henüz seçili bir görev yok.";
   cancelButton.disabled = true;
-  if (jobPollInterval) clearInterval(jobPollInterval);
+  if (logStream) {
+    logStream.close();
+    logStream = null;
+  }
 }
 
 async function cancelActiveJob() {
@@ -144,7 +167,7 @@ async function cancelActiveJob() {
   try {
     await fetchJSON(`${API_BASE}/jobs/${activeJobId}/cancel`, { method: "POST" });
     notify("Görev iptal edildi", "warn");
-    await updateActiveJob();
+    await updateActiveJobStatus();
   } catch (error) {
     notify(`İptal başarısız: ${error.message}`, "error");
   }
@@ -161,7 +184,7 @@ async function submitWithEndpoint(form, endpoint, buttonLabel) {
       headers: { "Content-Type": "application/json" },
       body: JSON.stringify(payload),
     });
-    notify(`${buttonLabel} başladı (job ${response.job_id.slice(0, 8)})`, "success");
+    notify(`${buttonLabel} başladı (job ${response.job_id})`, "success");
     await refreshJobs();
     selectJob(response.job_id);
   } catch (error) {